@@ -0,0 +1,70 @@
+import asyncio
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter
+
+from benchmarks.utils import BASE_DIR, setup, test_database, without_throttling, load_urls, wsgi_request, asgi_request, report
+
+ENDPOINTS = [
+    ("GET", "/api/v1/products/", ""),
+    ("GET", "/api/v1/products/1/", ""),
+    ("POST", "/api/v1/orders/", '{"comment": "1x Ice Cream 700ml", "delivery": false, "location": "location_test", "items": [{"product": 1, "quantity": 2, "complements": [1]}]}')
+]
+
+def run_wsgi(method, path, body, token, requests, concurrency):
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    start = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda i: wsgi_request(application, method, path, body, token), range(requests)))
+    return perf_counter() - start, results
+
+def run_asgi(method, path, body, token, requests, concurrency):
+    from django.core.asgi import get_asgi_application
+    application = get_asgi_application()
+    async def worker(count):
+        return [await asgi_request(application, method, path, body, token) for i in range(count)]
+    async def main():
+        return await asyncio.gather(*[worker(requests // concurrency) for i in range(concurrency)])
+    start = perf_counter()
+    results = [result for worker_results in asyncio.run(main()) for result in worker_results]
+    return perf_counter() - start, results
+
+def main():
+    parser = ArgumentParser(description="Carga concorrente nas views sync (WSGI) e async (ASGI) do catálogo e da criação de pedidos")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    options = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import AccessToken
+    from gelato_api.models import User, Product, Category, Complement
+    from gelato_api.views import ProductViewSet, OrderViewSet
+
+    # without the catalog cache every request reaches the ORM
+    settings.CACHES["benchmark"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    settings.CATALOG_CACHE_ALIAS = "benchmark"
+    if connection.vendor == "sqlite":
+        # the in-memory test database locks tables under concurrent writes, a file waits for the lock instead
+        connection.settings_dict["TEST"]["NAME"] = str(BASE_DIR / "bench_async.sqlite3")
+    rows = []
+    with test_database(), without_throttling(ProductViewSet, OrderViewSet):
+        user = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+        category = Category.objects.create(name="Ice Cream")
+        Product.objects.bulk_create([Product(name=f"item{i}", price="12.34", description="description test", max_complements=3, category=category, created_by=user) for i in range(100)])
+        Complement.objects.create(name="candy", increase_value="1.50", created_by=user).categories.set([category])
+        token = AccessToken.for_user(user)
+        for server, async_views, run in [("WSGI, views sync", False, run_wsgi), ("ASGI, views sync", False, run_asgi), ("ASGI, views async", True, run_asgi)]:
+            load_urls(async_views)
+            for method, path, body in ENDPOINTS:
+                for concurrency in options.concurrency:
+                    seconds, results = run(method, path, body, token, options.requests, concurrency)
+                    percentiles = quantiles([latency for latency, status in results], n=100)
+                    errors = sum(status >= 400 for latency, status in results)
+                    rows.append([server, f"{method} {path}", concurrency, f"{len(results) / seconds:.0f}", f"{percentiles[49] * 1000:.2f}", f"{percentiles[94] * 1000:.2f}", errors])
+    report(f"{options.requests} requisições por cenário (banco: {connection.vendor})", ["servidor", "endpoint", "concorrência", "req/s", "p50 ms", "p95 ms", "erros"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from argparse import ArgumentParser
+
+from benchmarks.utils import setup, test_database, without_throttling, timed, report
+
+def main():
+    parser = ArgumentParser(description="Consultas e tempo por requisição autenticada com e sem o cache de usuário")
+    parser.add_argument("--requests", type=int, default=200)
+    options = parser.parse_args()
+    setup()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    from gelato_api.authentication import CachedJWTAuthentication
+    from gelato_api.models import User
+    from gelato_api.views import OrderViewSet
+
+    with test_database(), without_throttling(OrderViewSet):
+        user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff=True)
+        client = APIClient(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        previous = OrderViewSet.authentication_classes
+        rows = []
+        for authentication_class in [JWTAuthentication, CachedJWTAuthentication]:
+            OrderViewSet.authentication_classes = [authentication_class]
+            client.get("/api/v1/orders/stats/")
+            with CaptureQueriesContext(connection) as context:
+                seconds = timed(lambda: client.get("/api/v1/orders/stats/"), options.requests)
+            rows.append([authentication_class.__name__, f"{len(context) / options.requests:.2f}", f"{seconds * 1000:.3f}"])
+        OrderViewSet.authentication_classes = previous
+    report(f"GET /api/v1/orders/stats/ x {options.requests}", ["autenticação", "consultas/req", "ms/req"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from benchmarks.utils import setup, test_database, without_throttling, report
+
+def main():
+    parser = ArgumentParser(description="Vazão de logins em /api/token/ por núcleo, com o hashing na thread da requisição ou no pool")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=8)
+    options = parser.parse_args()
+    setup()
+    from django.test import Client
+    from django.test.utils import override_settings
+    from gelato_api.views import LoginView
+    from gelato_api.models import User
+
+    cores = os.cpu_count()
+    modes = [
+        ("na requisição", {"OFFLOAD": False}),
+        ("pool de threads", {"OFFLOAD": True, "EXECUTOR": "thread", "WORKERS": cores, "MAX_PENDING": options.logins}),
+        ("pool de processos", {"OFFLOAD": True, "EXECUTOR": "process", "WORKERS": cores, "MAX_PENDING": options.logins})
+    ]
+    with test_database(), without_throttling(LoginView):
+        User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+        def login(i):
+            return Client().post("/api/token/", {"email": "normal@user.com", "password": "12345"}, content_type="application/json").status_code
+        rows = []
+        for name, config in modes:
+            with override_settings(PASSWORD_HASHING=config):
+                login(0)
+                start = perf_counter()
+                with ThreadPoolExecutor(options.clients) as clients:
+                    statuses = list(clients.map(login, range(options.logins)))
+                elapsed = perf_counter() - start
+            throughput = statuses.count(200) / elapsed
+            rows.append([name, statuses.count(200), statuses.count(503), f"{throughput:.1f}", f"{throughput / cores:.2f}"])
+    report(f"POST /api/token/ x {options.logins} com {options.clients} clientes em {cores} núcleos", ["hashing", "ok", "503", "logins/s", "logins/s/núcleo"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from argparse import ArgumentParser
+
+from benchmarks.utils import setup, test_database, without_throttling, timed, report
+
+def seed():
+    from gelato_api.models import User, Product, Category, Complement
+    user = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+    categories = Category.objects.bulk_create([Category(name=f"category{i}") for i in range(4)])
+    Product.objects.bulk_create([Product(name=f"Sorvete {i} 500ml", price="12.34", description="Sorvete artesanal com calda de morango, granulado e casquinha crocante", max_complements=3, category=categories[i % 4], created_by=user, image=f"{i:064x}.png") for i in range(30)])
+    complements = Complement.objects.bulk_create([Complement(name=f"Cobertura {i}", increase_value="1.50", created_by=user, image=f"{i + 100:064x}.png") for i in range(30)])
+    for complement in Complement.objects.all():
+        complement.categories.set(categories[:2])
+
+def main():
+    parser = ArgumentParser(description="Bytes trafegados e tempo de renderização de uma página completa de produtos e de complementos")
+    parser.add_argument("--repeat", type=int, default=500)
+    options = parser.parse_args()
+    setup()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from gelato_api.cache import get_cache
+    from gelato_api.middleware import brotli
+    from gelato_api.renderers import FastJSONRenderer, orjson
+    from gelato_api.views import ProductViewSet, ComplementViewSet
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+    rows = []
+    with test_database(), without_throttling(ProductViewSet, ComplementViewSet):
+        seed()
+        client = APIClient()
+        for url in ["/api/v1/products/", "/api/v1/complements/"]:
+            data = client.get(url).data
+            for renderer_class in [JSONRenderer, FastJSONRenderer]:
+                renderer = renderer_class()
+                seconds = timed(lambda: renderer.render(data), options.repeat)
+                rows.append([url, renderer_class.__name__, "-", "-", f"{seconds * 1000000:.1f}"])
+            for encoding in encodings:
+                get_cache().clear()
+                response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+                rows.append([url, "-", response.get("Content-Encoding", "identity"), len(response.content), "-"])
+    report(f"Página completa (orjson: {'sim' if orjson else 'não'}, brotli: {'sim' if brotli else 'não'})", ["endpoint", "renderer", "encoding", "bytes", "µs/render"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import random
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from time import perf_counter
+
+from benchmarks.utils import BASE_DIR, setup, test_database, without_throttling, load_urls, wsgi_request, asgi_request, percentile, report
+
+# weight, endpoint, method, path, body and who sends it; the placeholders are filled from the seeded data
+MIX = [
+    (25, "GET /api/v1/products/", "GET", "/api/v1/products/?page={page}", None, None),
+    (15, "GET /api/v1/products/{id}/", "GET", "/api/v1/products/{product}/", None, None),
+    (10, "GET /api/v1/products/{id}/complements/", "GET", "/api/v1/products/{product}/complements/", None, None),
+    (5, "GET /api/v1/products/?category=", "GET", "/api/v1/products/?category={category}&ordering=price", None, None),
+    (10, "GET /api/v1/categories/", "GET", "/api/v1/categories/", None, None),
+    (10, "GET /api/v1/complements/?category=", "GET", "/api/v1/complements/?category={category}", None, None),
+    (5, "POST /api/token/", "POST", "/api/token/", "login", None),
+    (15, "POST /api/v1/orders/", "POST", "/api/v1/orders/", "order", "client"),
+    (5, "GET /api/v1/orders/?status=", "GET", "/api/v1/orders/?status={status}", None, "staff")
+]
+
+def build_traffic(seeded, requests, rng):
+    from benchmarks.seed import STATUSES, PASSWORD
+    orderable = list(seeded["orderable"].items())
+    traffic = []
+    for weight, endpoint, method, path, body, auth in rng.choices(MIX, weights=[entry[0] for entry in MIX], k=requests):
+        values = {"page": rng.randint(1, 20), "product": rng.choice(seeded["product_ids"]), "category": rng.choice(seeded["category_ids"]), "status": rng.choice(STATUSES)}
+        if body == "login":
+            body = {"email": f"client{rng.randrange(len(seeded['user_ids']))}@gelato.com", "password": PASSWORD}
+        elif body == "order":
+            items = []
+            for product_id, (max_complements, complements) in rng.sample(orderable, rng.randint(1, 3)):
+                items.append({"product": product_id, "quantity": rng.randint(1, 3), "complements": rng.sample(complements, min(len(complements), rng.randint(0, max_complements)))})
+            body = {"comment": "replay", "delivery": rng.random() < 0.5, "location": "location", "items": items}
+        traffic.append({"endpoint": endpoint, "method": method, "path": path.format(**values), "body": body, "auth": auth})
+    return traffic
+
+def load_traffic(path):
+    # recorded requests, one JSON object per line with method, path and optionally endpoint, body and auth (client or staff)
+    traffic = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in filter(str.strip, f):
+            request = json.loads(line)
+            request.setdefault("endpoint", f"{request['method']} {request['path'].split('?')[0]}")
+            traffic.append({"body": None, "auth": None, **request})
+    return traffic
+
+def prepare(traffic, tokens, rng):
+    return [
+        (request["endpoint"], request["method"], request["path"], json.dumps(request["body"]) if request["body"] is not None else "", rng.choice(tokens[request["auth"]]) if request["auth"] else None)
+        for request in traffic
+    ]
+
+def run_wsgi(plan, concurrency):
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    def send(request):
+        endpoint, method, path, body, token = request
+        return (endpoint,) + wsgi_request(application, method, path, body, token)
+    start = perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(send, plan))
+    return perf_counter() - start, results
+
+def run_asgi(plan, concurrency):
+    from django.core.asgi import get_asgi_application
+    application = get_asgi_application()
+    async def worker(requests):
+        results = []
+        for endpoint, method, path, body, token in requests:
+            results.append((endpoint,) + await asgi_request(application, method, path, body, token))
+        return results
+    async def main():
+        return await asyncio.gather(*[worker(plan[i::concurrency]) for i in range(concurrency)])
+    start = perf_counter()
+    results = [result for worker_results in asyncio.run(main()) for result in worker_results]
+    return perf_counter() - start, results
+
+def summarize(seconds, results):
+    endpoints = {}
+    for endpoint, latency, status in results:
+        endpoints.setdefault(endpoint, []).append((latency, status))
+    endpoints["total"] = [(latency, status) for endpoint, latency, status in results]
+    summary = {}
+    for endpoint, samples in endpoints.items():
+        latencies = sorted(latency for latency, status in samples)
+        summary[endpoint] = {
+            "requests": len(samples),
+            "errors": sum(status >= 400 for latency, status in samples),
+            "throughput": len(samples) / seconds,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000
+        }
+    return summary
+
+def find_regressions(results, baseline, tolerance):
+    regressions = []
+    for server, endpoints in results.items():
+        for endpoint, current in endpoints.items():
+            previous = baseline.get(server, {}).get(endpoint)
+            if previous is None:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{server} {endpoint}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+            if current["throughput"] < previous["throughput"] * (1 - tolerance):
+                regressions.append(f"{server} {endpoint}: vazão {previous['throughput']:.1f} -> {current['throughput']:.1f} req/s")
+            if current["errors"] / current["requests"] > previous["errors"] / previous["requests"]:
+                regressions.append(f"{server} {endpoint}: erros {previous['errors']}/{previous['requests']} -> {current['errors']}/{current['requests']}")
+    return regressions
+
+def main():
+    parser = ArgumentParser(description="Carga mista (catálogo, logins e pedidos) sobre uma base populada, com p50/p95/p99 e vazão por endpoint")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--complements", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--servers", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+    parser.add_argument("--seed", type=int, default=0, help="Semente da base e do tráfego gerado, repita para comparar execuções")
+    parser.add_argument("--traffic", help="Arquivo JSON lines com o tráfego gravado a repetir no lugar do tráfego gerado")
+    parser.add_argument("--record", help="Grava o tráfego usado neste arquivo JSON lines")
+    parser.add_argument("--no-cache", action="store_true", help="Desativa o cache do catálogo")
+    parser.add_argument("--output", help="Salva os resultados em JSON")
+    parser.add_argument("--baseline", help="Resultados JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa aceita no p95 e na vazão antes de falhar")
+    options = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import AccessToken
+    from benchmarks.seed import seed
+    from gelato_api.models import User
+    from gelato_api.views import ProductViewSet, CategoryViewSet, ComplementViewSet, OrderViewSet, UserViewSet, LoginView
+
+    if options.no_cache:
+        settings.CACHES["benchmark"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        settings.CATALOG_CACHE_ALIAS = "benchmark"
+    if connection.vendor == "sqlite":
+        # the in-memory test database locks tables under concurrent writes, a file waits for the lock instead
+        connection.settings_dict["TEST"]["NAME"] = str(BASE_DIR / "bench_replay.sqlite3")
+    rng = random.Random(options.seed)
+    results = {}
+    with test_database(), without_throttling(ProductViewSet, CategoryViewSet, ComplementViewSet, OrderViewSet, UserViewSet, LoginView):
+        start = perf_counter()
+        seeded = seed(products=options.products, complements=options.complements, users=options.users, orders=options.orders, rng=rng)
+        print(f"base populada em {perf_counter() - start:.1f}s")
+        traffic = load_traffic(options.traffic) if options.traffic else build_traffic(seeded, options.requests, rng)
+        if options.record:
+            with open(options.record, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(request) + "\n" for request in traffic)
+        tokens = {"client": [str(AccessToken.for_user(user)) for user in User.objects.filter(id__in=seeded["user_ids"][:100])], "staff": [str(AccessToken.for_user(seeded["staff"]))]}
+        plan = prepare(traffic, tokens, rng)
+        for server in options.servers:
+            run = run_wsgi if server == "wsgi" else run_asgi
+            # as deployed: sync views under WSGI, async views under ASGI (root_api/asgi.py)
+            load_urls(server == "asgi")
+            # a first pass warms the URL resolver, the connections and the caches
+            run(plan[:options.concurrency * 5], options.concurrency)
+            seconds, server_results = run(plan, options.concurrency)
+            results[server] = summarize(seconds, server_results)
+    rows = [
+        [server, endpoint, values["requests"], values["errors"], f"{values['throughput']:.1f}", f"{values['p50_ms']:.2f}", f"{values['p95_ms']:.2f}", f"{values['p99_ms']:.2f}"]
+        for server, endpoints in results.items() for endpoint, values in endpoints.items()
+    ]
+    report(f"{len(plan)} requisições com concorrência {options.concurrency} (banco: {connection.vendor})", ["servidor", "endpoint", "reqs", "erros", "req/s", "p50 ms", "p95 ms", "p99 ms"], rows)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now(timezone.utc).isoformat(), "database": connection.vendor, "options": vars(options), "results": results}, f, indent=2)
+    if options.baseline:
+        with open(options.baseline, "r", encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f)["results"], options.tolerance)
+        if regressions:
+            sys.exit("Regressões acima de {:.0%}:\n{}".format(options.tolerance, "\n".join(regressions)))
+        print(f"\nsem regressões acima de {options.tolerance:.0%} em relação a {options.baseline}")
+
+if __name__ == "__main__":
+    main()
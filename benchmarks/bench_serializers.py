@@ -0,0 +1,56 @@
+from argparse import ArgumentParser
+
+from benchmarks.utils import setup, test_database, timed, report
+
+def seed(size):
+    from gelato_api.models import User, Product, Category, Complement, Order, OrderItem, OrderItemComplement
+    user = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+    categories = Category.objects.bulk_create([Category(name=f"category{i}") for i in range(size)], batch_size=2000)
+    Product.objects.bulk_create([Product(name=f"item{i}", price="12.34", description="description test", max_complements=3, category=categories[i % 10], created_by=user, image=f"{i:064x}.png") for i in range(size)], batch_size=2000)
+    Complement.objects.bulk_create([Complement(name=f"candy{i}", increase_value="1.50", created_by=user) for i in range(size)], batch_size=2000)
+    products, complements = list(Product.objects.order_by("id")), list(Complement.objects.order_by("id"))
+    Complement.categories.through.objects.bulk_create([Complement.categories.through(complement_id=complement.id, category_id=categories[i % 10].id) for i, complement in enumerate(complements)], batch_size=2000)
+    Order.objects.bulk_create([Order(user=user, comment=f"{i}x Ice Cream 700ml", delivery=False, location="location_test", status="Pedido solicitado", total="13.84") for i in range(size)], batch_size=2000)
+    orders = list(Order.objects.order_by("id"))
+    OrderItem.objects.bulk_create([OrderItem(order=order, product=products[i], quantity=1, unit_price="13.84", total="13.84") for i, order in enumerate(orders)], batch_size=2000)
+    OrderItemComplement.objects.bulk_create([OrderItemComplement(item=item, complement=complements[i], increase_value="1.50") for i, item in enumerate(OrderItem.objects.order_by("id"))], batch_size=2000)
+
+def main():
+    parser = ArgumentParser(description="Tempo de listagem com os serializers do DRF e com a leitura direta de .values()")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+    setup()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from gelato_api.models import Product, Category, Complement, Order
+    from gelato_api.readers import get_reader
+    from gelato_api.serializers import ProductSerializer, CategorySerializer, ComplementSerializer, OrderSerializer
+
+    endpoints = [
+        ("products", ProductSerializer, lambda size: Product.objects.order_by("id")[:size]),
+        ("categories", CategorySerializer, lambda size: Category.objects.order_by("id")[:size]),
+        ("complements", ComplementSerializer, lambda size: Complement.objects.prefetch_related("categories").order_by("id")[:size]),
+        ("orders", OrderSerializer, lambda size: Order.objects.prefetch_related("items__complements").order_by("id")[:size])
+    ]
+    request = Request(APIRequestFactory().get("/api/v1/"))
+    renderer = JSONRenderer()
+    rows = []
+    with test_database():
+        seed(max(options.sizes))
+        for size in options.sizes:
+            for name, serializer_class, get_queryset in endpoints:
+                reader = get_reader(serializer_class)
+                def serializer_path():
+                    return renderer.render(serializer_class(get_queryset(size), many=True, context={"request": request}).data)
+                def values_path():
+                    return renderer.render(reader.read(list(reader.values(get_queryset(size))), request))
+                assert serializer_path() == values_path()
+                serializer_seconds = timed(serializer_path, options.repeat)
+                values_seconds = timed(values_path, options.repeat)
+                rows.append([name, size, f"{serializer_seconds * 1000:.2f}", f"{values_seconds * 1000:.2f}", f"{serializer_seconds / values_seconds:.1f}x"])
+    report("Listagem renderizada em JSON (mesmos bytes nos dois caminhos)", ["endpoint", "linhas", "serializer ms", "values ms", "ganho"], rows)
+
+if __name__ == "__main__":
+    main()
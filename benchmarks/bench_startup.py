@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser, SUPPRESS
+from io import BytesIO
+from statistics import median
+from time import perf_counter
+
+from benchmarks.utils import BASE_DIR, report
+
+VARIANTS = [
+    ("conexão por requisição", {"DATABASE_CONN_MAX_AGE": "0"}),
+    ("conexão persistente", {"DATABASE_CONN_MAX_AGE": "60", "DATABASE_CONN_HEALTH_CHECKS": "true"})
+]
+
+def wsgi_get(application, path):
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "", "SERVER_NAME": "testserver", "SERVER_PORT": "80",
+        "HTTP_HOST": "testserver", "wsgi.input": BytesIO(), "wsgi.url_scheme": "http", "wsgi.errors": sys.stderr
+    }
+    start = perf_counter()
+    response = application(environ, lambda status, headers: None)
+    b"".join(response)
+    response.close()
+    return perf_counter() - start
+
+def child(requests):
+    # runs in a fresh interpreter so the import cost is measured from scratch
+    start = perf_counter()
+    sys.path.insert(0, str(BASE_DIR))
+    os.chdir(BASE_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "root_api.settings")
+    import django
+    from django.conf import settings
+    settings.DATABASES
+    settings_seconds = perf_counter() - start
+    django.setup()
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    import root_api.urls
+    import_seconds = perf_counter() - start
+
+    from django.db import connection
+    from benchmarks.utils import test_database
+    from gelato_api.models import User, Product, Category
+    settings.CACHES["benchmark"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    settings.CATALOG_CACHE_ALIAS = "benchmark"
+    if connection.vendor == "sqlite":
+        # an in-memory database would vanish with the connection closed between requests
+        connection.settings_dict["TEST"]["NAME"] = str(BASE_DIR / f"bench_startup_{os.getpid()}.sqlite3")
+    with test_database():
+        user = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+        category = Category.objects.create(name="Ice Cream")
+        Product.objects.bulk_create([Product(name=f"item{i}", price="12.34", description="description test", max_complements=3, category=category, created_by=user) for i in range(20)])
+        connection.close()
+        first_seconds = wsgi_get(application, "/api/v1/products/")
+        latencies = [wsgi_get(application, "/api/v1/products/") for i in range(requests)]
+    print(json.dumps({"settings": settings_seconds, "import": import_seconds, "first": first_seconds, "next": median(latencies)}))
+
+def main():
+    parser = ArgumentParser(description="Tempo de importação e latência da primeira requisição com e sem conexões persistentes")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--child", action="store_true", help=SUPPRESS)
+    options = parser.parse_args()
+    if options.child:
+        return child(options.requests)
+    rows = []
+    for name, variables in VARIANTS:
+        results = []
+        for i in range(options.runs):
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "--requests", str(options.requests)], env={**os.environ, **variables}, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.splitlines()[-1]))
+        rows.append([name] + [f"{median(result[key] for result in results) * 1000:.2f}" for key in ["settings", "import", "first", "next"]])
+    report(f"mediana de {options.runs} processos, {options.requests} requisições após a primeira", ["variante", "settings ms", "importação ms", "1ª requisição ms", "seguintes p50 ms"], rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+STATUSES = ["Pedido solicitado", "Em preparo", "Saiu para entrega", "Entregue", "Cancelado"]
+PASSWORD = "12345"
+
+def batched(objects, size):
+    for start in range(0, len(objects), size):
+        yield objects[start:start + size]
+
+def seed(categories=20, products=5000, complements=1000, users=1000, orders=1000000, batch_size=10000, days=365, rng=None):
+    # bulk inserts skip the signals, so the order statistics are rebuilt at the end
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+    from django.utils import timezone
+    from gelato_api.models import User, Category, Product, Complement, Order, OrderItem, OrderItemComplement
+    from gelato_api.stats import rebuild_order_stats
+
+    rng = rng or random.Random(0)
+    password = make_password(PASSWORD)
+    staff = User.objects.create_user(email="staff@gelato.com", password=PASSWORD, first_name="Staff", last_name="Gelato", is_staff=True)
+    User.objects.bulk_create([User(email=f"client{i}@gelato.com", password=password, first_name="Client", last_name=str(i)) for i in range(users)], batch_size=batch_size)
+    user_ids = list(User.objects.filter(is_staff=False).values_list("id", flat=True))
+
+    Category.objects.bulk_create([Category(name=f"category{i}") for i in range(categories)])
+    category_ids = list(Category.objects.values_list("id", flat=True))
+    Product.objects.bulk_create([
+        Product(name=f"product{i}", price=Decimal(rng.randint(500, 4000)) / 100, description="description test", max_complements=rng.randint(1, 4), category_id=rng.choice(category_ids), in_stock=rng.random() < 0.9, created_by=staff)
+        for i in range(products)
+    ], batch_size=batch_size)
+    Complement.objects.bulk_create([
+        Complement(name=f"complement{i}", increase_value=Decimal(rng.randint(0, 600)) / 100, in_stock=rng.random() < 0.9, created_by=staff)
+        for i in range(complements)
+    ], batch_size=batch_size)
+    complement_categories = {}
+    links = []
+    for complement_id in Complement.objects.values_list("id", flat=True):
+        for category_id in rng.sample(category_ids, min(len(category_ids), rng.randint(1, 3))):
+            complement_categories.setdefault(category_id, []).append(complement_id)
+            links.append(Complement.categories.through(complement_id=complement_id, category_id=category_id))
+    Complement.categories.through.objects.bulk_create(links, batch_size=batch_size)
+    product_rows = {row["id"]: row for row in Product.objects.values("id", "price", "category_id", "max_complements", "in_stock")}
+    increase_values = dict(Complement.objects.values_list("id", "increase_value"))
+    allowed = {product_id: complement_categories.get(row["category_id"], []) for product_id, row in product_rows.items()}
+
+    # each batch of orders is one day of history, spread over the last `days` days
+    now = timezone.now()
+    product_ids = list(product_rows)
+    for number, batch in enumerate(batched(range(orders), batch_size)):
+        with transaction.atomic():
+            plans = []
+            for i in batch:
+                items = []
+                for product_id in rng.sample(product_ids, rng.randint(1, 3)):
+                    row = product_rows[product_id]
+                    chosen = rng.sample(allowed[product_id], min(len(allowed[product_id]), rng.randint(0, row["max_complements"])))
+                    quantity = rng.randint(1, 3)
+                    unit_price = row["price"] + sum(increase_values[complement_id] for complement_id in chosen)
+                    items.append((product_id, quantity, unit_price, chosen))
+                plans.append(items)
+            created = Order.objects.bulk_create([
+                Order(user_id=rng.choice(user_ids), comment="seeded", delivery=rng.random() < 0.5, location="location", status=rng.choice(STATUSES), active=rng.random() < 0.1, total=sum(quantity * unit_price for product_id, quantity, unit_price, chosen in items))
+                for items in plans
+            ])
+            if created[0].pk is None:
+                created = list(Order.objects.order_by("-id")[:len(plans)])[::-1]
+            Order.objects.filter(id__gte=created[0].pk, id__lte=created[-1].pk).update(created_at=now - timedelta(days=number % days, minutes=rng.randint(0, 720)))
+            order_items = OrderItem.objects.bulk_create([
+                OrderItem(order_id=order.pk, product_id=product_id, quantity=quantity, unit_price=unit_price, total=quantity * unit_price)
+                for order, items in zip(created, plans) for product_id, quantity, unit_price, chosen in items
+            ])
+            if order_items[0].pk is None:
+                order_items = list(OrderItem.objects.order_by("-id")[:len(order_items)])[::-1]
+            chosen_lists = [chosen for items in plans for product_id, quantity, unit_price, chosen in items]
+            OrderItemComplement.objects.bulk_create([
+                OrderItemComplement(item_id=item.pk, complement_id=complement_id, increase_value=increase_values[complement_id])
+                for item, chosen in zip(order_items, chosen_lists) for complement_id in chosen
+            ])
+    rebuild_order_stats()
+    # what a client can actually order: products and complements in stock
+    complements_in_stock = set(Complement.objects.filter(in_stock=True).values_list("id", flat=True))
+    orderable = {
+        product_id: (row["max_complements"], [complement_id for complement_id in allowed[product_id] if complement_id in complements_in_stock])
+        for product_id, row in product_rows.items() if row["in_stock"]
+    }
+    return {"staff": staff, "user_ids": user_ids, "category_ids": category_ids, "product_ids": product_ids, "orderable": orderable}
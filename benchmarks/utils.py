@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from time import perf_counter
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+def setup():
+    sys.path.insert(0, str(BASE_DIR))
+    os.chdir(BASE_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "root_api.settings")
+    import django
+    django.setup()
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+@contextmanager
+def without_throttling(*viewsets):
+    previous = [viewset.throttle_classes for viewset in viewsets]
+    for viewset in viewsets:
+        viewset.throttle_classes = []
+    try:
+        yield
+    finally:
+        for viewset, throttle_classes in zip(viewsets, previous):
+            viewset.throttle_classes = throttle_classes
+
+def load_urls(async_views):
+    # the viewsets pick the sync or async view when the URLconf is imported
+    from django.conf import settings
+    from django.urls import clear_url_caches
+    settings.ASYNC_VIEWS = async_views
+    for module in ["root_api.urls", "gelato_api.urls"]:
+        sys.modules.pop(module, None)
+    clear_url_caches()
+
+def wsgi_request(application, method, path, body, token):
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query, "SERVER_NAME": "testserver", "SERVER_PORT": "80",
+        "HTTP_HOST": "testserver", "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)), "wsgi.input": BytesIO(body.encode()), "wsgi.url_scheme": "http", "wsgi.errors": sys.stderr
+    }
+    if token:
+        environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    start = perf_counter()
+    response = application(environ, lambda status, headers: None)
+    b"".join(response)
+    response.close()
+    return perf_counter() - start, response.status_code
+
+async def asgi_request(application, method, path, body, token):
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "", "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    }
+    if token:
+        scope["headers"].append((b"authorization", f"Bearer {token}".encode()))
+    messages = [{"type": "http.request", "body": body.encode(), "more_body": False}]
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+    status = []
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+    start = perf_counter()
+    await application(scope, receive, send)
+    return perf_counter() - start, status[0]
+
+def timed(function, repeat):
+    start = perf_counter()
+    for i in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat
+
+def percentile(latencies, percent):
+    # nearest rank over sorted latencies
+    return latencies[max(0, -(-len(latencies) * percent // 100) - 1)]
+
+def report(title, header, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    print(f"\n{title}")
+    for row in [header] + rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GelatoApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gelato_api'
+
+    def ready(self):
+        from . import signals
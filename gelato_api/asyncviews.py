@@ -0,0 +1,91 @@
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+from rest_framework import status
+from rest_framework.response import Response
+
+class AsyncViewSetMixin:
+    # actions served by async handlers (a<action>); the others keep the sync viewset path
+    async_actions = ()
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not getattr(settings, "ASYNC_VIEWS", False) or not set(actions.values()) & set(cls.async_actions):
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            method = request.method.lower()
+            action = actions.get(method) or (actions.get("get") if method == "head" else None)
+            if action not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = {**actions, "head": actions.get("head", actions.get("get"))}
+            for method, action in self.action_map.items():
+                if action:
+                    setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # authentication, permissions and throttles may read the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, "apaginate_queryset"):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def acreate(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # Django has no async transactions, so the atomic validation and save run in one thread hop
+        data = await sync_to_async(self.perform_validated_create)(serializer)
+        return Response(data, status=status.HTTP_201_CREATED, headers=self.get_success_headers(data))
+
+    def perform_validated_create(self, serializer):
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return serializer.data
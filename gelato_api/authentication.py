@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY = "auth:user:{}"
+CACHED_USER_FIELDS = ("id", "email", "first_name", "last_name", "is_staff", "is_active", "is_superuser")
+
+def get_user_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE_ALIAS", "default")]
+
+def invalidate_user(user_id):
+    get_user_cache().delete(USER_KEY.format(user_id))
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        cache = get_user_cache()
+        key = USER_KEY.format(user_id)
+        flags = cache.get(key)
+        if flags is None:
+            user = super().get_user(validated_token)
+            cache.set(key, {field: getattr(user, field) for field in CACHED_USER_FIELDS}, getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60))
+            return user
+        if not flags["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        # every other field is deferred: it loads lazily if read and save() only writes the cached fields
+        fields = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in flags]
+        return self.user_model.from_db(DEFAULT_DB_ALIAS, fields, [flags[field] for field in fields])
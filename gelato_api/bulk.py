@@ -0,0 +1,163 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status, serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from .cache import invalidate
+from .menus import get_menu_categories, schedule_menu_rebuild
+
+def get_row_id(row):
+    try:
+        return int(row["id"])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+class BulkMixin:
+    bulk_serializer_class = None
+    bulk_unique_fields = ("name",)
+    bulk_foreign_keys = {}
+    bulk_many_to_many = {}
+    bulk_stamp_users = True
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def bulk(self, request):
+        if not isinstance(request.data, list) or not request.data:
+            raise serializers.ValidationError({"non_field_errors": ["Esperava uma lista de itens não vazia."]})
+        if request.method == "POST":
+            return self.bulk_create(request)
+        if request.method == "PATCH":
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def get_bulk_model(self):
+        return self.get_queryset().model
+
+    def validate_bulk_rows(self, rows, ids, partial=False):
+        errors = []
+        validated = []
+        for row in rows:
+            serializer = self.bulk_serializer_class(data=row, partial=partial, context=self.get_serializer_context())
+            serializer.is_valid()
+            errors.append(dict(serializer.errors))
+            validated.append({} if serializer.errors else dict(serializer.validated_data))
+        model = self.get_bulk_model()
+        for field in self.bulk_unique_fields:
+            values = [data[field] for data in validated if field in data]
+            taken = dict(model.objects.filter(**{f"{field}__in": values}).values_list(field, "id"))
+            seen = set()
+            for row_id, data, error in zip(ids, validated, errors):
+                if field in data:
+                    if data[field] in seen or taken.get(data[field], row_id) != row_id:
+                        error.setdefault(field, []).append(UniqueValidator.message)
+                    seen.add(data[field])
+        does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages["does_not_exist"]
+        for field, related_model in {**self.bulk_foreign_keys, **self.bulk_many_to_many}.items():
+            values = [data[field] if field in self.bulk_many_to_many else [data[field]] for data in validated if field in data]
+            existing = set(related_model.objects.filter(id__in={pk for pks in values for pk in pks}).values_list("id", flat=True))
+            for data, error in zip(validated, errors):
+                if field in data:
+                    pks = data[field] if field in self.bulk_many_to_many else [data[field]]
+                    for pk in pks:
+                        if pk not in existing:
+                            error.setdefault(field, []).append(does_not_exist.format(pk_value=pk))
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def get_bulk_fields(self, data):
+        fields = {field: value for field, value in data.items() if field not in self.bulk_many_to_many}
+        for field in self.bulk_foreign_keys:
+            if field in fields:
+                fields[f"{field}_id"] = fields.pop(field)
+        return fields
+
+    def set_bulk_many_to_many(self, instances, validated):
+        model = self.get_bulk_model()
+        for field in self.bulk_many_to_many:
+            descriptor = getattr(model, field)
+            source = f"{descriptor.field.m2m_field_name()}_id"
+            target = f"{descriptor.field.m2m_reverse_field_name()}_id"
+            changed = [(instance, data[field]) for instance, data in zip(instances, validated) if field in data]
+            descriptor.through.objects.filter(**{f"{source}__in": [instance.pk for instance, pks in changed]}).delete()
+            descriptor.through.objects.bulk_create([
+                descriptor.through(**{source: instance.pk, target: pk})
+                for instance, pks in changed for pk in dict.fromkeys(pks)
+            ])
+
+    def get_bulk_response(self, ids, response_status):
+        instances = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([instances[pk] for pk in ids], many=True)
+        return Response(serializer.data, status=response_status)
+
+    def bulk_create(self, request):
+        model = self.get_bulk_model()
+        validated = self.validate_bulk_rows(request.data, [None] * len(request.data))
+        with transaction.atomic():
+            instances = [model(**self.get_bulk_fields(data)) for data in validated]
+            for instance in instances:
+                if self.bulk_stamp_users:
+                    instance.created_by = request.user
+            model.objects.bulk_create(instances)
+            if instances[0].pk is None:
+                # backends without RETURNING (MySQL) don't set the pks, the unique names identify the new rows
+                pks = dict(model.objects.filter(name__in=[instance.name for instance in instances]).values_list("name", "id"))
+                for instance in instances:
+                    instance.pk = pks[instance.name]
+            self.set_bulk_many_to_many(instances, validated)
+            invalidate(model)
+            schedule_menu_rebuild(get_menu_categories(model, [instance.pk for instance in instances]))
+        return self.get_bulk_response([instance.pk for instance in instances], status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        model = self.get_bulk_model()
+        ids = [get_row_id(row) if isinstance(row, dict) else None for row in request.data]
+        instances = model.objects.in_bulk([pk for pk in ids if pk is not None])
+        errors = []
+        seen = set()
+        for pk in ids:
+            if pk not in instances:
+                errors.append({"id": ["Objeto não encontrado."]})
+            elif pk in seen:
+                errors.append({"id": ["Id repetido na lista."]})
+            else:
+                errors.append({})
+            seen.add(pk)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        validated = self.validate_bulk_rows(request.data, ids, partial=True)
+        # bulk_update skips auto_now, the conditional GET validators need updated_at to move
+        stamp_updated_at = any(field.name == "updated_at" for field in model._meta.concrete_fields)
+        fields = {"updated_at"} if stamp_updated_at else set()
+        now = timezone.now()
+        with transaction.atomic():
+            # bulk writes skip the model signals, so the menus they touch (before and after) are rebuilt here
+            menu_categories = get_menu_categories(model, ids)
+            for pk, data in zip(ids, validated):
+                for field, value in self.get_bulk_fields(data).items():
+                    setattr(instances[pk], field, value)
+                    fields.add(field)
+                if stamp_updated_at:
+                    instances[pk].updated_at = now
+                if self.bulk_stamp_users:
+                    instances[pk].updated_by = request.user
+            if self.bulk_stamp_users:
+                fields.add("updated_by")
+            if fields:
+                model.objects.bulk_update([instances[pk] for pk in ids], fields)
+            self.set_bulk_many_to_many([instances[pk] for pk in ids], validated)
+            invalidate(model)
+            schedule_menu_rebuild(menu_categories | get_menu_categories(model, ids))
+        return self.get_bulk_response(ids, status.HTTP_200_OK)
+
+    def bulk_destroy(self, request):
+        model = self.get_bulk_model()
+        ids = [get_row_id({"id": pk}) for pk in request.data]
+        existing = set(model.objects.filter(id__in=[pk for pk in ids if pk is not None]).values_list("id", flat=True))
+        missing = [{} if pk in existing else {"id": ["Objeto não encontrado."]} for pk in ids]
+        if any(missing):
+            raise serializers.ValidationError(missing)
+        with transaction.atomic():
+            model.objects.filter(id__in=ids).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
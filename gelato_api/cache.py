@@ -0,0 +1,99 @@
+from hashlib import md5
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = "catalog:version:{}"
+RESPONSE_KEY = "catalog:response:{}:{}:{}"
+
+def get_cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+def version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+def get_versions(models):
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # a counter lost to eviction restarts from the clock, so it never reuses an old version
+            cache.add(key, time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+async def aget_versions(models):
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time_ns(), None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+def bump_version(model):
+    cache = get_cache()
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time_ns(), None)
+
+def invalidate(model):
+    bump_version(model)
+    # bump again after commit so responses cached while the transaction was open are dropped too
+    transaction.on_commit(lambda: bump_version(model))
+
+def response_key(request, name, versions):
+    versions = ".".join(str(version) for version in versions)
+    return RESPONSE_KEY.format(name, versions, md5(request.build_absolute_uri().encode()).hexdigest())
+
+class CachedResponseMixin:
+    cache_models = ()
+
+    def get_cache_timeout(self):
+        timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", None)
+        if getattr(self, "read_from_replica", False):
+            # a lagging replica can answer after the version bump, so its responses only live for the pin window
+            pin = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+            timeout = pin if timeout is None else min(timeout, pin)
+        return timeout
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_key(request, f"{self.basename}-{self.action}", get_versions(self.cache_models))
+        data = None if getattr(self, "pinned_to_primary", False) else cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        return response
+
+    async def aget_cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_key(request, f"{self.basename}-{self.action}", await aget_versions(self.cache_models))
+        data = None if getattr(self, "pinned_to_primary", False) else await cache.aget(key)
+        if data is not None:
+            return Response(data)
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.data, self.get_cache_timeout())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aget_cached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aget_cached_response(super().aretrieve, request, *args, **kwargs)
@@ -0,0 +1,115 @@
+from hashlib import md5
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_cache, get_versions, aget_versions, response_key
+
+class ConditionalGetMixin:
+    last_modified_field = "updated_at"
+
+    def get_state(self, queryset):
+        try:
+            return queryset.order_by().aggregate(count=Count("pk"), last_modified=Max(self.last_modified_field))
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+    async def aget_state(self, queryset):
+        try:
+            return await queryset.order_by().aaggregate(count=Count("pk"), last_modified=Max(self.last_modified_field))
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+    def get_validators(self, request, state):
+        if not state["count"]:
+            return None, None
+        timestamp = int(state["last_modified"].timestamp())
+        key = f"{request.build_absolute_uri()}:{request.accepted_renderer.format}:{state['count']}:{state['last_modified'].isoformat()}"
+        return quote_etag(md5(key.encode()).hexdigest()), timestamp
+
+    def get_validators_key(self, request, versions):
+        return response_key(request, f"{self.basename}-{self.action}-validators-{request.accepted_renderer.format}", versions)
+
+    def use_cached_validators(self):
+        return bool(getattr(self, "cache_models", ())) and not getattr(self, "pinned_to_primary", False)
+
+    def get_cached_validators(self, request, queryset):
+        # catalog views keep the validators under the same version counters as their cached responses, a hit skips the aggregate
+        if not self.use_cached_validators():
+            return self.get_validators(request, self.get_state(queryset))
+        cache = get_cache()
+        key = self.get_validators_key(request, get_versions(self.cache_models))
+        validators = cache.get(key)
+        if validators is None:
+            validators = self.get_validators(request, self.get_state(queryset))
+            cache.set(key, validators, self.get_cache_timeout())
+        return validators
+
+    async def aget_cached_validators(self, request, queryset):
+        if not self.use_cached_validators():
+            return self.get_validators(request, await self.aget_state(queryset))
+        cache = get_cache()
+        key = self.get_validators_key(request, await aget_versions(self.cache_models))
+        validators = await cache.aget(key)
+        if validators is None:
+            validators = self.get_validators(request, await self.aget_state(queryset))
+            await cache.aset(key, validators, self.get_cache_timeout())
+        return validators
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_conditional_response(self, handler, queryset, request, *args, **kwargs):
+        etag, last_modified = self.get_cached_validators(request, queryset)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        # answered from the validators alone, the serializer never runs for a 304
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    async def aget_conditional_response(self, handler, queryset, request, *args, **kwargs):
+        etag, last_modified = await self.aget_cached_validators(request, queryset)
+        if etag is None:
+            return await handler(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    def get_object_queryset(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # a lookup that doesn't fit the field is a missing object, as in get_object_or_404
+        try:
+            return self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+    def is_keyset_list(self, request):
+        # keyset pages never count the table, the COUNT of the validators would bring that back
+        return hasattr(self.paginator, "is_keyset") and self.paginator.is_keyset(request)
+
+    def list(self, request, *args, **kwargs):
+        if self.is_keyset_list(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.get_conditional_response(super().list, queryset, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(super().retrieve, self.get_object_queryset(), request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        if self.is_keyset_list(request):
+            return await super().alist(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return await self.aget_conditional_response(super().alist, queryset, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aget_conditional_response(super().aretrieve, self.get_object_queryset(), request, *args, **kwargs)
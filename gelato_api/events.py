@@ -0,0 +1,95 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+class Broker(ABC):
+    keepalive = 15
+    max_queue_size = 100
+
+    @abstractmethod
+    def publish(self, message):
+        pass
+
+    @abstractmethod
+    def listen(self):
+        # an async generator of formatted messages
+        pass
+
+    async def stream(self):
+        # listen() yields None once subscribed and on every idle keepalive interval
+        messages = self.listen()
+        try:
+            async for message in messages:
+                yield message or ": keepalive\n\n"
+        finally:
+            await messages.aclose()
+
+class InProcessBroker(Broker):
+    def __init__(self):
+        self.subscribers = set()
+
+    def publish(self, message):
+        # the message is formatted once, every subscriber gets the same string
+        for loop, queue in list(self.subscribers):
+            loop.call_soon_threadsafe(self.deliver, queue, message)
+
+    def deliver(self, queue, message):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    async def listen(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_queue_size))
+        self.subscribers.add(subscriber)
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers.discard(subscriber)
+
+class RedisBroker(Broker):
+    channel = "gelato_api:orders"
+
+    def __init__(self):
+        from redis import Redis
+        from redis.asyncio import Redis as AsyncRedis
+        self.url = settings.ORDER_EVENTS_REDIS_URL
+        self.client = Redis.from_url(self.url)
+        self.async_client_class = AsyncRedis
+
+    def publish(self, message):
+        self.client.publish(self.channel, message)
+
+    async def listen(self):
+        client = self.async_client_class.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            yield None
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.keepalive)
+                yield message["data"].decode() if message else None
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await client.aclose()
+
+@lru_cache
+def get_broker():
+    return import_string(getattr(settings, "ORDER_EVENTS_BROKER", "gelato_api.events.InProcessBroker"))()
+
+def publish_order_event(event, data):
+    message = format_event(event, data)
+    transaction.on_commit(lambda: get_broker().publish(message))
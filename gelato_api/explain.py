@@ -0,0 +1,51 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: USING INDEX \w+)?$")
+
+def count_rows(cursor, connection, table):
+    cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+    return cursor.fetchone()[0]
+
+def sqlite_full_scans(cursor, connection, sql):
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+    details = [row[-1] for row in cursor.fetchall()]
+    # an unfiltered scan in index/rowid order that stops at LIMIT reads only one page of rows,
+    # with a WHERE it may read the whole table before finding a page of matches
+    if re.search(r"\bLIMIT\b", sql) and not re.search(r"\bWHERE\b", sql) and not any("TEMP B-TREE" in detail for detail in details):
+        return []
+    tables = connection.introspection.table_names(cursor)
+    scans = []
+    for detail in details:
+        match = SQLITE_SCAN.match(detail)
+        if match and match.group(1) in tables:
+            scans.append((match.group(1), count_rows(cursor, connection, match.group(1))))
+    return scans
+
+def mysql_full_scans(cursor, connection, sql):
+    cursor.execute(f"EXPLAIN {sql}")
+    columns = [column[0] for column in cursor.description]
+    plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return [(row["table"], row["rows"]) for row in plan if row["type"] == "ALL"]
+
+PLANNERS = {
+    "sqlite": sqlite_full_scans,
+    "mysql": mysql_full_scans
+}
+
+def find_full_scans(queries, using="default", max_rows=None):
+    if max_rows is None:
+        max_rows = getattr(settings, "QUERY_PLAN_MAX_SCAN_ROWS", 1000)
+    connection = connections[using]
+    planner = PLANNERS[connection.vendor]
+    full_scans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query["sql"].lstrip().upper().startswith("SELECT"):
+                continue
+            for table, rows in planner(cursor, connection, query["sql"]):
+                if rows and rows > max_rows:
+                    full_scans.append({"sql": query["sql"], "table": table, "rows": rows})
+    return full_scans
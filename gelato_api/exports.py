@@ -0,0 +1,40 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+ORDER_EXPORT_FIELDS = ["id", "user", "user__email", "comment", "delivery", "location", "status", "active", "total", "created_at"]
+ORDER_EXPORT_HEADER = ["id", "user", "email", "comment", "delivery", "location", "status", "active", "total", "created"]
+
+class Echo:
+    def write(self, value):
+        return value
+
+def iterate_in_chunks(queryset, chunk_size=2000):
+    # keyset batches by id keep memory flat on backends without server-side cursors (MySQL)
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by("id")[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+def export_rows(queryset):
+    for row in iterate_in_chunks(queryset.values_list(*ORDER_EXPORT_FIELDS)):
+        yield row[:-1] + (row[-1].strftime("%d/%m/%Y %H:%M:%S"),)
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(ORDER_EXPORT_HEADER)
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
+
+def stream_ndjson(queryset):
+    for row in export_rows(queryset):
+        yield json.dumps(dict(zip(ORDER_EXPORT_HEADER, row)), cls=DjangoJSONEncoder) + "\n"
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson")
+}
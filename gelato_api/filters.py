@@ -0,0 +1,11 @@
+class FilterMixin:
+    filter_serializer_class = None
+    filter_actions = ("list",)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.filter_serializer_class is None or self.action not in self.filter_actions:
+            return queryset
+        filters = self.filter_serializer_class(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filters.filter_queryset(queryset)
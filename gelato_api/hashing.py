@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import exceptions
+
+PASSWORD_HASHING_DEFAULTS = {
+    "OFFLOAD": False,
+    "EXECUTOR": "thread",
+    "WORKERS": None,
+    "MAX_PENDING": 64
+}
+
+class HashingBusy(exceptions.APIException):
+    status_code = 503
+    default_detail = "Muitas autenticações em andamento, tente novamente em instantes."
+    default_code = "hashing_busy"
+
+def setup_worker():
+    import django
+    django.setup()
+
+class HashingPool:
+    def __init__(self, config):
+        workers = config["WORKERS"] or os.cpu_count()
+        if config["EXECUTOR"] == "process":
+            self.executor = ProcessPoolExecutor(workers, initializer=setup_worker)
+        else:
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix="password-hashing")
+        # bounds running plus queued hashes, the rest is refused instead of piling up
+        self.slots = BoundedSemaphore(config["MAX_PENDING"])
+
+    def run(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            return self.executor.submit(function, *args).result()
+        finally:
+            self.slots.release()
+
+pool = None
+pool_config = None
+pool_lock = Lock()
+
+def get_config():
+    return {**PASSWORD_HASHING_DEFAULTS, **getattr(settings, "PASSWORD_HASHING", {})}
+
+def get_pool(config):
+    global pool, pool_config
+    with pool_lock:
+        if pool is None or pool_config != config:
+            if pool is not None:
+                pool.executor.shutdown(wait=False)
+            pool = HashingPool(config)
+            pool_config = config
+        return pool
+
+def run(function, *args):
+    config = get_config()
+    if not config["OFFLOAD"]:
+        return function(*args)
+    return get_pool(config).run(function, *args)
+
+def make_password(password):
+    return run(hashers.make_password, password)
+
+def check_password(password, encoded, setter=None):
+    is_correct, must_update = run(hashers.verify_password, password, encoded)
+    # the rehash is saved by the caller's thread, inside its own connection and transaction
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
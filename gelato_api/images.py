@@ -0,0 +1,105 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANTS = {
+    "thumbnail": 160,
+    "small": 480
+}
+
+executor = None
+
+def get_file_name(value):
+    return getattr(value, "name", value) or None
+
+def variant_name(name, variant):
+    return f"variants/{PurePosixPath(name).stem}-{variant}.webp"
+
+def variant_urls(name, ready, request=None):
+    if not name:
+        return None
+    variants = {}
+    for variant in IMAGE_VARIANTS:
+        # until the variants are generated every size points to the original image
+        url = default_storage.url(variant_name(name, variant) if ready else name)
+        variants[variant] = request.build_absolute_uri(url) if request else url
+    return variants
+
+def generate_variants(name):
+    # names are content hashes, so existing variants already match this image
+    if all(default_storage.exists(variant_name(name, variant)) for variant in IMAGE_VARIANTS):
+        return
+    with default_storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size))
+        buffer = BytesIO()
+        resized.save(buffer, "WEBP", quality=80)
+        path = variant_name(name, variant)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(buffer.getvalue()))
+
+def mark_variants_ready(name):
+    from .menus import get_menu_categories, schedule_menu_rebuild
+    from .models import Product, Complement
+    # only rows still pointing to this image, a replaced one waits for its own variants
+    for model in (Product, Complement):
+        ids = list(model.objects.filter(image=name, image_variants_ready=False).values_list("id", flat=True))
+        if ids:
+            model.objects.filter(id__in=ids).update(image_variants_ready=True, updated_at=timezone.now())
+            invalidate(model)
+            schedule_menu_rebuild(get_menu_categories(model, ids))
+
+def process_image(name):
+    try:
+        generate_variants(name)
+        mark_variants_ready(name)
+    except Exception:
+        logger.exception("Falha ao gerar as variantes da imagem %s", name)
+
+def process_image_in_worker(name):
+    try:
+        process_image(name)
+    finally:
+        # worker threads never see the request_finished signal that recycles connections
+        connections.close_all()
+
+def get_executor():
+    global executor
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=getattr(settings, "IMAGE_WORKERS", 2), thread_name_prefix="image-variants")
+    return executor
+
+def schedule_variants(name):
+    if getattr(settings, "IMAGE_WORKERS", 2):
+        transaction.on_commit(lambda: get_executor().submit(process_image_in_worker, name))
+    else:
+        transaction.on_commit(lambda: process_image(name))
+
+def collect_image(name):
+    from .models import Product, Complement
+    # identical uploads share one file, it is only removed once no row points to it
+    if Product.objects.filter(image=name).exists() or Complement.objects.filter(image=name).exists():
+        return
+    for path in [name] + [variant_name(name, variant) for variant in IMAGE_VARIANTS]:
+        default_storage.delete(path)
+
+def schedule_collect(name):
+    transaction.on_commit(lambda: collect_image(name))
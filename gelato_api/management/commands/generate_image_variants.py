@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from gelato_api.images import process_image
+from gelato_api.models import Product, Complement
+
+class Command(BaseCommand):
+    help = "Gera as variantes das imagens que ainda não as têm (imagens anteriores ou falhas na geração)"
+
+    def handle(self, *args, **options):
+        names = set()
+        for model in (Product, Complement):
+            names.update(model.objects.filter(image_variants_ready=False).exclude(image="").exclude(image=None).values_list("image", flat=True))
+        for name in sorted(names):
+            process_image(name)
+        self.stdout.write(self.style.SUCCESS(f"{len(names)} imagens processadas."))
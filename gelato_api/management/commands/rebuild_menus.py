@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from gelato_api.menus import rebuild_menus
+
+class Command(BaseCommand):
+    help = "Recalcula os cardápios pré-calculados de todas as categorias"
+
+    def handle(self, *args, **options):
+        menus = rebuild_menus()
+        self.stdout.write(self.style.SUCCESS(f"{menus} cardápios recalculados."))
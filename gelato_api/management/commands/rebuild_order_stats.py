@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from gelato_api.stats import rebuild_order_stats
+
+class Command(BaseCommand):
+    help = "Recalcula as estatísticas diárias de pedidos a partir do histórico"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-days", type=int, default=30, help="Quantidade de dias agregados por consulta")
+
+    def handle(self, *args, **options):
+        buckets = rebuild_order_stats(options["batch_days"])
+        self.stdout.write(self.style.SUCCESS(f"{buckets} linhas de estatísticas recalculadas."))
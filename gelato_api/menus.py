@@ -0,0 +1,79 @@
+from django.db import transaction
+from rest_framework import serializers
+
+from .images import variant_urls
+from .models import Category, Product, Complement, CategoryMenu
+
+money = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+def image_url(model, name):
+    return model._meta.get_field("image").storage.url(name) if name else None
+
+def get_complement_categories(complement_ids):
+    if not complement_ids:
+        return set()
+    return set(Complement.categories.through.objects.filter(complement_id__in=complement_ids).values_list("category_id", flat=True))
+
+def build_menus(category_ids):
+    # three queries for any number of categories; serving the result reads a single table
+    menus = {
+        category["id"]: {"id": category["id"], "name": category["name"], "products": []}
+        for category in Category.objects.filter(id__in=category_ids).order_by("id").values("id", "name")
+    }
+    complements = {category_id: [] for category_id in menus}
+    links = (
+        Complement.categories.through.objects.filter(category_id__in=menus, complement__in_stock=True)
+        .order_by("complement_id")
+        .values("category_id", "complement_id", "complement__name", "complement__increase_value", "complement__image")
+    )
+    for link in links:
+        complements[link["category_id"]].append({
+            "id": link["complement_id"],
+            "name": link["complement__name"],
+            "increase_value": money.to_representation(link["complement__increase_value"]),
+            "image": image_url(Complement, link["complement__image"])
+        })
+    products = (
+        Product.objects.filter(category_id__in=menus, in_stock=True)
+        .order_by("id")
+        .values("id", "name", "price", "description", "image", "image_variants_ready", "max_complements", "category_id")
+    )
+    for product in products:
+        menus[product["category_id"]]["products"].append({
+            "id": product["id"],
+            "name": product["name"],
+            "price": money.to_representation(product["price"]),
+            "description": product["description"],
+            "image": image_url(Product, product["image"]),
+            "image_variants": variant_urls(product["image"], product["image_variants_ready"]),
+            "max_complements": product["max_complements"],
+            "complements": complements[product["category_id"]]
+        })
+    return menus
+
+def rebuild_menus(category_ids=None, complement_ids=()):
+    category_ids = set(Category.objects.values_list("id", flat=True)) if category_ids is None else set(category_ids)
+    category_ids |= get_complement_categories(complement_ids)
+    category_ids.discard(None)
+    if not category_ids:
+        return 0
+    menus = build_menus(category_ids)
+    with transaction.atomic():
+        CategoryMenu.objects.filter(category_id__in=category_ids).delete()
+        CategoryMenu.objects.bulk_create([CategoryMenu(category_id=category_id, document=document) for category_id, document in menus.items()])
+    return len(menus)
+
+def schedule_menu_rebuild(category_ids=(), complement_ids=()):
+    # after commit, so the documents are built from committed rows (and never for rolled back changes)
+    category_ids, complement_ids = set(category_ids), set(complement_ids)
+    if category_ids or complement_ids:
+        transaction.on_commit(lambda: rebuild_menus(category_ids, complement_ids))
+
+def get_menu_categories(model, pks):
+    if model is Category:
+        return set(pks)
+    if model is Product:
+        return set(Product.objects.filter(pk__in=pks).values_list("category_id", flat=True))
+    if model is Complement:
+        return get_complement_categories(pks)
+    return set()
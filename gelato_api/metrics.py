@@ -0,0 +1,175 @@
+import logging
+import random
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger("gelato_api.slow_queries")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+current = ContextVar("current_metrics", default=None)
+
+class RequestMetrics:
+    __slots__ = ("route", "queries", "db_seconds", "serializer_seconds")
+
+    def __init__(self):
+        self.route = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names, values, extra=""):
+    labels = ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(filter(None, [labels, extra])) + "}"
+
+class Histogram:
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            # one counter per bucket plus +Inf, then the sum
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self.series.items()):
+            count = 0
+            for bound, observations in zip(self.buckets + ("+Inf",), series):
+                count += observations
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{format_labels(self.labels, labels, le)} {count}"
+            yield f"{self.name}_sum{format_labels(self.labels, labels)} {series[-1]}"
+            yield f"{self.name}_count{format_labels(self.labels, labels)} {count}"
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.series = {}
+
+    def inc(self, labels):
+        self.series[labels] = self.series.get(labels, 0) + 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.series.items()):
+            yield f"{self.name}_total{format_labels(self.labels, labels)} {value}"
+
+class Registry:
+    # per process: each worker exposes its own series and Prometheus sums them by instance
+    def __init__(self):
+        self.lock = Lock()
+        labels = ("route", "method")
+        self.requests = Counter("gelato_requests", "Requisições atendidas.", labels + ("status",))
+        self.duration = Histogram("gelato_request_duration_seconds", "Tempo total da requisição.", labels, DURATION_BUCKETS)
+        self.queries = Histogram("gelato_request_db_queries", "Consultas ao banco por requisição.", labels, QUERY_BUCKETS)
+        self.db_duration = Histogram("gelato_request_db_duration_seconds", "Tempo gasto no banco por requisição.", labels, DURATION_BUCKETS)
+        self.serializer_duration = Histogram("gelato_request_serializer_duration_seconds", "Tempo gasto serializando a resposta.", labels, DURATION_BUCKETS)
+        self.response_size = Histogram("gelato_response_size_bytes", "Tamanho do corpo da resposta (sem compressão).", labels, SIZE_BUCKETS)
+
+    def observe(self, route, method, status, seconds, size, metrics):
+        labels = (route, method)
+        with self.lock:
+            self.requests.inc(labels + (str(status),))
+            self.duration.observe(labels, seconds)
+            self.queries.observe(labels, metrics.queries)
+            self.db_duration.observe(labels, metrics.db_seconds)
+            self.serializer_duration.observe(labels, metrics.serializer_seconds)
+            if size is not None:
+                self.response_size.observe(labels, size)
+
+    def render(self):
+        with self.lock:
+            metrics = [self.requests, self.duration, self.queries, self.db_duration, self.serializer_duration, self.response_size]
+            return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+registry = Registry()
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = perf_counter() - start
+        metrics.queries += 1
+        metrics.db_seconds += seconds
+        log_slow_query(metrics, sql, seconds)
+
+def log_slow_query(metrics, sql, seconds):
+    threshold = getattr(settings, "SLOW_QUERY_MS", None)
+    if threshold is None or seconds * 1000 < threshold:
+        return
+    if random.random() < getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 1.0):
+        logger.warning("%.1f ms em %s: %s", seconds * 1000, metrics.route or "-", sql)
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+@contextmanager
+def measure_serializer():
+    metrics = current.get()
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_seconds += perf_counter() - start
+
+def timed_representation(to_representation):
+    @wraps(to_representation)
+    def wrapper(*args, **kwargs):
+        with measure_serializer():
+            return to_representation(*args, **kwargs)
+    return wrapper
+
+def observe_request(request, response, metrics, seconds):
+    size = None if response.streaming else len(response.content)
+    registry.observe(get_route(request, metrics), request.method, response.status_code, seconds, size, metrics)
+
+def get_route(request, metrics):
+    if metrics.route is not None:
+        return metrics.route
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "unmatched"
+
+class MetricsMixin:
+    # names the route after the viewset action and times the serializers the view builds
+    def initial(self, request, *args, **kwargs):
+        metrics = current.get()
+        if metrics is not None:
+            metrics.route = f"{type(self).__name__}.{self.action}"
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if current.get() is not None:
+            serializer.to_representation = timed_representation(serializer.to_representation)
+        return serializer
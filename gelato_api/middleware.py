@@ -0,0 +1,89 @@
+import re
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import RequestMetrics, current, observe_request
+from .routers import pin_to_primary
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = re.compile(r"\bbr\b")
+
+class CompressionMiddleware(GZipMiddleware):
+    # brotli when the client accepts it and the package is installed, gzip otherwise
+    skipped_content_types = ("text/event-stream", "image/")
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or response.get("Content-Type", "").startswith(self.skipped_content_types):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, "COMPRESSION_MIN_SIZE", 1024):
+            return response
+        if brotli is not None and not response.streaming and re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return self.compress_brotli(response)
+        return super().process_response(request, response)
+
+    def compress_brotli(self, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(response.content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    # after a successful write the client reads from the primary for REPLICA_PIN_SECONDS
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request, response)
+        return response
+
+class MetricsMiddleware:
+    # per route histograms of wall, database and serializer time plus response size, served by the metrics view
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        observe_request(request, response, metrics, perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        observe_request(request, response, metrics, perf_counter() - start)
+        return response
@@ -3,6 +3,9 @@ from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, Permis
 from django.utils import timezone
 from os import urandom
 
+from . import hashing
+from .storage import get_content_storage
+
 def upload(instance, filename):
     return f"{instance.created_at.strftime('%d%m%y%H%M%S')}{urandom(5).hex()}-{filename.replace('-', '')}"
 
@@ -46,6 +49,17 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return hashing.check_password(raw_password, self.password, setter)
+
     @property
     def last_login_date(self):
         if self.last_login:
@@ -58,6 +72,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = "Usuário"
         verbose_name_plural = "Usuários"
+        indexes = [models.Index(fields=["date_joined", "id"])]
 
     def __str__(self):
         return f"{self.id} | {self.first_name} | {self.email}"
@@ -80,6 +95,7 @@ class Item(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def created(self):
@@ -88,6 +104,7 @@ class Category(models.Model):
     class Meta:
         verbose_name = "Categoria"
         verbose_name_plural = "Categorias"
+        indexes = [models.Index(fields=["updated_at"])]
 
     def __str__(self):
         return f"Categoria Nº {self.id}: {self.name}"
@@ -95,7 +112,8 @@ class Category(models.Model):
 class Complement(Item):
     name = models.CharField(max_length=255, unique=True)
     increase_value = models.DecimalField(max_digits=10, decimal_places=2)
-    image = models.ImageField(upload_to=upload, null=True)
+    image = models.ImageField(upload_to=upload, storage=get_content_storage, null=True)
+    image_variants_ready = models.BooleanField(default=False)
     categories = models.ManyToManyField(Category, related_name="complements")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="complements_created")
     updated_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name="complements_updated")
@@ -103,6 +121,11 @@ class Complement(Item):
     class Meta:
         verbose_name = "Complemento"
         verbose_name_plural = "Complementos"
+        indexes = [
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["in_stock", "id"]),
+            models.Index(fields=["increase_value"])
+        ]
 
     def __str__(self):
         return f"Complemento Nº {self.id}: {self.name}"
@@ -111,7 +134,8 @@ class Product(Item):
     name = models.CharField(max_length=255, unique=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(max_length=500)
-    image = models.ImageField(upload_to=upload, null=True)
+    image = models.ImageField(upload_to=upload, storage=get_content_storage, null=True)
+    image_variants_ready = models.BooleanField(default=False)
     max_complements = models.IntegerField()
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="products_created")
@@ -120,6 +144,11 @@ class Product(Item):
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
+        indexes = [
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["category", "in_stock"]),
+            models.Index(fields=["price"])
+        ]
 
     def __str__(self):
         return f"Produto Nº {self.id}: {self.name}"
@@ -131,7 +160,9 @@ class Order(models.Model):
     location = models.CharField(max_length=255)
     status = models.CharField(max_length=100)
     active = models.BooleanField(default=True)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     @property
     def created(self):
@@ -140,6 +171,74 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["active", "status", "created_at"]),
+            models.Index(fields=["user", "created_at"]),
+            models.Index(fields=["updated_at"])
+        ]
+
+    def __str__(self):
+        return f"Pedido Nº {self.id}: {self.status}"
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, related_name="order_items")
+    quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+
+    @property
+    def complement_ids(self):
+        return [item_complement.complement_id for item_complement in self.complements.all()]
+
+    class Meta:
+        verbose_name = "Item do pedido"
+        verbose_name_plural = "Itens do pedido"
+
+    def __str__(self):
+        return f"Item Nº {self.id} do pedido Nº {self.order_id}"
+
+class OrderItemComplement(models.Model):
+    item = models.ForeignKey(OrderItem, on_delete=models.CASCADE, related_name="complements")
+    complement = models.ForeignKey(Complement, on_delete=models.SET_NULL, null=True, related_name="order_items")
+    increase_value = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        verbose_name = "Complemento do item"
+        verbose_name_plural = "Complementos do item"
+
+    def __str__(self):
+        return f"Complemento Nº {self.complement_id} do item Nº {self.item_id}"
+
+class DailyOrderStats(models.Model):
+    day = models.DateField()
+    status = models.CharField(max_length=100)
+    delivery = models.BooleanField()
+    active = models.BooleanField()
+    orders = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Estatística diária de pedidos"
+        verbose_name_plural = "Estatísticas diárias de pedidos"
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "delivery", "active"], name="unique_daily_order_stats")
+        ]
+
+    def __str__(self):
+        return f"{self.day} | {self.status} | {self.orders} pedidos"
+
+class CategoryMenu(models.Model):
+    # nested menu of the category (products in stock and their complements), rebuilt by gelato_api.menus
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, primary_key=True, related_name="menu")
+    document = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cardápio da categoria"
+        verbose_name_plural = "Cardápios das categorias"
 
     def __str__(self):
-        return f"Pedido Nº {self.id}: {self.status}"
\ No newline at end of file
+        return f"Cardápio da categoria Nº {self.category_id}"
@@ -0,0 +1,71 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # same steps as paginate_queryset, with the count and the page read through the async ORM
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+class KeysetPagination(CursorPagination):
+    ordering = ("created_at", "id")
+
+class PageOrKeysetPagination(BasePagination):
+    mode_query_param = "pagination"
+    modes = ("page", "cursor")
+    ordering_query_param = "ordering"
+    keyset_ordering = ("created_at", "id")
+
+    def is_keyset(self, request):
+        return request.query_params.get(self.mode_query_param) == "cursor"
+
+    def get_paginator(self, request):
+        mode = request.query_params.get(self.mode_query_param, "page")
+        if mode not in self.modes:
+            raise ValidationError({self.mode_query_param: [f"Valor inválido, use {' ou '.join(self.modes)}."]})
+        if self.is_keyset(request):
+            # the cursor encodes a position in the keyset order, so no other ordering is accepted
+            if self.ordering_query_param in request.query_params:
+                raise ValidationError({self.ordering_query_param: [f"Não pode ser usado com {self.mode_query_param}=cursor, que ordena por {', '.join(self.keyset_ordering)}."]})
+            paginator = KeysetPagination()
+            paginator.ordering = self.keyset_ordering
+            return paginator
+        return PageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return PageNumberPagination().get_schema_operation_parameters(view)
+
+class OrderPagination(PageOrKeysetPagination):
+    keyset_ordering = ("created_at", "id")
+
+class UserPagination(PageOrKeysetPagination):
+    keyset_ordering = ("date_joined", "id")
+
+class MenuPagination(PageNumberPagination):
+    # the whole menu fits in one page for any usual number of categories
+    page_size = 50
@@ -0,0 +1,23 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class FastJSONRenderer(JSONRenderer):
+    # same bytes as JSONRenderer (compact, utf-8), encoded by orjson when it is installed
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON):
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        encoder = self.encoder_class()
+        # datetimes, Decimal, lazy strings and the rest keep the formatting of DRF's encoder
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        try:
+            ret = orjson.dumps(data, default=encoder.default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -0,0 +1,65 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import get_cache
+
+PIN_COOKIE = "primary_pin"
+PIN_KEY = "replica:pin:{}"
+
+current_view = ContextVar("current_view", default=None)
+
+def get_pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", 5)
+
+def pin_to_primary(request, response):
+    # the cookie covers browsers and anonymous clients, the cache entry covers token clients
+    response.set_cookie(PIN_COOKIE, "1", max_age=get_pin_seconds(), httponly=True, samesite="Lax")
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        get_cache().set(PIN_KEY.format(user.pk), True, get_pin_seconds())
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    return request.user.is_authenticated and bool(get_cache().get(PIN_KEY.format(request.user.pk)))
+
+class ReplicaReadMixin:
+    # safe requests read from a replica once authentication has run on the primary
+    read_from_replica = False
+    pinned_to_primary = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and getattr(settings, "DATABASE_REPLICAS", []):
+            self.pinned_to_primary = is_pinned(request)
+            self.read_from_replica = not self.pinned_to_primary
+
+    def dispatch(self, request, *args, **kwargs):
+        token = current_view.set(self)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            current_view.reset(token)
+
+    async def adispatch(self, request, *args, **kwargs):
+        token = current_view.set(self)
+        try:
+            return await super().adispatch(request, *args, **kwargs)
+        finally:
+            current_view.reset(token)
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        view = current_view.get()
+        if view is not None and view.read_from_replica:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
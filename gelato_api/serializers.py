@@ -1,9 +1,21 @@
+from decimal import Decimal
+from datetime import datetime, time, timedelta
 from rest_framework import serializers
-from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 
-from .models import Product, Category, Complement, Order, User
+from .events import publish_order_event
+from .hashing import make_password
+from .images import get_file_name, variant_urls
+from .sparse import SparseFieldsSerializerMixin
+from .models import Product, Category, Complement, Order, OrderItem, OrderItemComplement, User
 
-class ProductSerializer(serializers.ModelSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    image_variants = serializers.SerializerMethodField()
+    def get_image_variants(self, obj):
+        return variant_urls(get_file_name(obj.image), obj.image_variants_ready, self.context.get("request"))
+
+class ProductSerializer(ImageVariantsMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = [
@@ -12,6 +24,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "price",
             "description",
             "image",
+            "image_variants",
             "max_complements",
             "in_stock",
             "category",
@@ -30,7 +43,15 @@ class ProductSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class ProductBulkSerializer(ProductSerializer):
+    category = serializers.IntegerField()
+    class Meta(ProductSerializer.Meta):
+        extra_kwargs = {
+            **ProductSerializer.Meta.extra_kwargs,
+            "name": {"validators": []}
+        }
+
+class CategorySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = [
@@ -39,7 +60,13 @@ class CategorySerializer(serializers.ModelSerializer):
             "created"
         ]
 
-class ComplementSerializer(serializers.ModelSerializer):
+class CategoryBulkSerializer(CategorySerializer):
+    class Meta(CategorySerializer.Meta):
+        extra_kwargs = {
+            "name": {"validators": []}
+        }
+
+class ComplementSerializer(ImageVariantsMixin, SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Complement
         fields = [
@@ -47,6 +74,7 @@ class ComplementSerializer(serializers.ModelSerializer):
             "name",
             "increase_value",
             "image",
+            "image_variants",
             "categories",
             "created",
             "updated"
@@ -63,28 +91,202 @@ class ComplementSerializer(serializers.ModelSerializer):
         validated_data["updated_by"] = self.context["request"].user
         return super().update(instance, validated_data)
 
-class OrderSerializer(serializers.ModelSerializer):
+class ComplementBulkSerializer(ComplementSerializer):
+    categories = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    class Meta(ComplementSerializer.Meta):
+        extra_kwargs = {
+            **ComplementSerializer.Meta.extra_kwargs,
+            "name": {"validators": []}
+        }
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product = serializers.IntegerField(source="product_id")
+    complements = serializers.ListField(child=serializers.IntegerField(), source="complement_ids", default=list)
+    class Meta:
+        model = OrderItem
+        fields = [
+            "id",
+            "product",
+            "quantity",
+            "complements",
+            "unit_price",
+            "total"
+        ]
+        read_only_fields = ["unit_price", "total"]
+        extra_kwargs = {
+            "quantity": {"min_value": 1}
+        }
+
+class OrderSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    items = OrderItemSerializer(many=True, required=False)
     class Meta:
         model = Order
         fields = [
             "id",
             "comment",
+            "items",
+            "total",
             "delivery",
             "location",
             "status",
             "active",
             "created"
         ]
+        read_only_fields = ["total"]
         extra_kwargs = {
             "active": {"default": True},
             "status": {"default": "Pedido solicitado"}
         }
+    def validate_items(self, items):
+        products = Product.objects.in_bulk({item["product_id"] for item in items})
+        complement_ids = {complement_id for item in items for complement_id in item["complement_ids"]}
+        complements = Complement.objects.in_bulk(complement_ids)
+        allowed = set(Complement.categories.through.objects.filter(complement_id__in=complement_ids).values_list("complement_id", "category_id"))
+        errors = []
+        for item in items:
+            error = {}
+            product = products.get(item["product_id"])
+            if product is None or not product.in_stock:
+                error["product"] = [f"Produto {item['product_id']} não está disponível."]
+            else:
+                if len(item["complement_ids"]) > product.max_complements:
+                    error["complements"] = [f"O produto {product.id} aceita no máximo {product.max_complements} complementos."]
+                for complement_id in item["complement_ids"]:
+                    complement = complements.get(complement_id)
+                    if complement is None or not complement.in_stock or (complement_id, product.category_id) not in allowed:
+                        error.setdefault("complements", []).append(f"Complemento {complement_id} não está disponível para o produto {product.id}.")
+                if not error:
+                    item["product"] = product
+                    item["complements"] = [complements[complement_id] for complement_id in item["complement_ids"]]
+                    item["unit_price"] = product.price + sum(complement.increase_value for complement in item["complements"])
+                    item["total"] = item["unit_price"] * item["quantity"]
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+    def create_items(self, order, items):
+        order_items = OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=item["product"], quantity=item["quantity"], unit_price=item["unit_price"], total=item["total"])
+            for item in items
+        ])
+        if order_items and order_items[0].pk is None:
+            # backends without RETURNING (MySQL) don't set the pks, rows of one INSERT get consecutive ids
+            order_items = list(order.items.order_by("id"))
+        OrderItemComplement.objects.bulk_create([
+            OrderItemComplement(item=order_item, complement=complement, increase_value=complement.increase_value)
+            for order_item, item in zip(order_items, items) for complement in item["complements"]
+        ])
+        prefetch_related_objects([order], "items__complements")
+    def publish(self, event, order):
+        publish_order_event(event, {
+            "id": order.id,
+            "status": order.status,
+            "active": order.active,
+            "delivery": order.delivery,
+            "location": order.location,
+            "total": order.total,
+            "created": order.created
+        })
+    @transaction.atomic
     def create(self, validated_data):
+        items = validated_data.pop("items", [])
         validated_data["user"] = self.context["request"].user
         validated_data["status"] = "Pedido solicitado"
-        return super().create(validated_data)
+        validated_data["total"] = sum(item["total"] for item in items)
+        order = super().create(validated_data)
+        self.create_items(order, items)
+        self.publish("created", order)
+        return order
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        previous = (instance.status, instance.active)
+        items = validated_data.pop("items", None)
+        if items is not None:
+            instance.items.all().delete()
+            validated_data["total"] = sum(item["total"] for item in items)
+        order = super().update(instance, validated_data)
+        if items is not None:
+            self.create_items(order, items)
+        if (order.status, order.active) != previous:
+            self.publish("updated", order)
+        return order
+
+class FilterSerializer(serializers.Serializer):
+    range_fields = {}
+    def validate(self, data):
+        for low, high in self.range_fields.items():
+            if low in data and high in data and data[low] > data[high]:
+                raise serializers.ValidationError({high: [f"Deve ser maior ou igual a {low}."]})
+        return data
+    def filter_queryset(self, queryset):
+        ordering = self.validated_data.get("ordering")
+        if ordering:
+            queryset = queryset.order_by(ordering, "-id" if ordering.startswith("-") else "id")
+        return queryset
+
+class ItemFilterSerializer(FilterSerializer):
+    price_field = "price"
+    range_fields = {"price_min": "price_max"}
+    category = serializers.IntegerField(required=False, min_value=1)
+    in_stock = serializers.BooleanField(required=False, allow_null=True, default=None)
+    price_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=Decimal("0"))
+    price_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=Decimal("0"))
+    search = serializers.CharField(required=False, max_length=255)
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if data["in_stock"] is not None:
+            queryset = queryset.filter(in_stock=data["in_stock"])
+        if "price_min" in data:
+            queryset = queryset.filter(**{f"{self.price_field}__gte": data["price_min"]})
+        if "price_max" in data:
+            queryset = queryset.filter(**{f"{self.price_field}__lte": data["price_max"]})
+        if "search" in data:
+            # prefix match so the unique index on name is used (LIKE 'term%')
+            queryset = queryset.filter(name__istartswith=data["search"])
+        return super().filter_queryset(queryset)
+
+class ProductFilterSerializer(ItemFilterSerializer):
+    ordering = serializers.ChoiceField(choices=["id", "-id", "name", "-name", "price", "-price"], required=False)
+    def filter_queryset(self, queryset):
+        if "category" in self.validated_data:
+            queryset = queryset.filter(category_id=self.validated_data["category"])
+        return super().filter_queryset(queryset)
+
+class ComplementFilterSerializer(ItemFilterSerializer):
+    price_field = "increase_value"
+    ordering = serializers.ChoiceField(choices=["id", "-id", "name", "-name", "increase_value", "-increase_value"], required=False)
+    def filter_queryset(self, queryset):
+        if "category" in self.validated_data:
+            queryset = queryset.filter(categories__id=self.validated_data["category"])
+        return super().filter_queryset(queryset)
+
+class OrderFilterSerializer(FilterSerializer):
+    range_fields = {"created_from": "created_to"}
+    created_from = serializers.DateField(required=False)
+    created_to = serializers.DateField(required=False)
+    status = serializers.CharField(required=False)
+    active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    ordering = serializers.ChoiceField(choices=["id", "-id", "created_at", "-created_at"], required=False)
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if "created_from" in data:
+            queryset = queryset.filter(created_at__gte=datetime.combine(data["created_from"], time.min))
+        if "created_to" in data:
+            queryset = queryset.filter(created_at__lt=datetime.combine(data["created_to"] + timedelta(days=1), time.min))
+        if "status" in data:
+            queryset = queryset.filter(status=data["status"])
+        if data["active"] is not None:
+            queryset = queryset.filter(active=data["active"])
+        return super().filter_queryset(queryset)
+
+class OrderExportSerializer(OrderFilterSerializer):
+    output = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+
+class OrderStatsSerializer(serializers.Serializer):
+    day_from = serializers.DateField(required=False)
+    day_to = serializers.DateField(required=False)
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -0,0 +1,127 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import invalidate_user
+from .cache import invalidate
+from .menus import get_complement_categories, schedule_menu_rebuild
+from .metrics import install_query_recorder
+from .images import get_file_name, schedule_variants, schedule_collect
+from .models import Product, Category, Complement, Order, User
+from .stats import STATS_FIELDS, get_stats_key, move_order_stats
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Complement)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Complement)
+def invalidate_catalog(sender, **kwargs):
+    invalidate(sender)
+
+@receiver(m2m_changed, sender=Complement.categories.through)
+def invalidate_complement_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    # keeps updated_at, and so the conditional GET validators, in step with the categories
+    if action == "pre_clear" and reverse:
+        Complement.objects.filter(categories=instance).update(updated_at=timezone.now())
+    if action.startswith("post_"):
+        if not reverse:
+            Complement.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+        elif pk_set:
+            Complement.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+        invalidate(Complement)
+
+@receiver(pre_delete, sender=Category)
+def touch_category_complements(sender, instance, **kwargs):
+    Complement.objects.filter(categories=instance).update(updated_at=timezone.now())
+
+@receiver(post_init, sender=Order)
+def snapshot_order_stats(sender, instance, **kwargs):
+    # read from __dict__ so deferred fields are never loaded here
+    instance._stats_key = get_stats_key(instance.__dict__) if instance.pk else None
+
+@receiver(pre_save, sender=Order)
+def load_order_stats(sender, instance, **kwargs):
+    if instance.pk and instance._stats_key is None:
+        previous = sender.objects.filter(pk=instance.pk).values(*STATS_FIELDS).first()
+        instance._stats_key = get_stats_key(previous) if previous else None
+
+@receiver(post_save, sender=Order)
+def update_order_stats(sender, instance, **kwargs):
+    current = get_stats_key(instance.__dict__)
+    move_order_stats(instance._stats_key, current)
+    instance._stats_key = current
+
+@receiver(post_delete, sender=Order)
+def remove_order_stats(sender, instance, **kwargs):
+    move_order_stats(instance._stats_key, None)
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=Complement)
+def snapshot_image(sender, instance, **kwargs):
+    instance._image_name = get_file_name(instance.__dict__.get("image"))
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Complement)
+def reset_image_variants(sender, instance, **kwargs):
+    if get_file_name(instance.__dict__.get("image")) != instance._image_name:
+        instance.image_variants_ready = False
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Complement)
+def process_new_image(sender, instance, **kwargs):
+    name = get_file_name(instance.image)
+    if name and name != instance._image_name:
+        schedule_variants(name)
+    if instance._image_name and name != instance._image_name:
+        schedule_collect(instance._image_name)
+    instance._image_name = name
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Complement)
+def collect_deleted_image(sender, instance, **kwargs):
+    if instance._image_name:
+        schedule_collect(instance._image_name)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+@receiver(post_init, sender=Product)
+def snapshot_menu_category(sender, instance, **kwargs):
+    instance._menu_category_id = instance.__dict__.get("category_id")
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def rebuild_product_menus(sender, instance, **kwargs):
+    # a product moved to another category leaves the previous menu too
+    schedule_menu_rebuild({instance._menu_category_id, instance.category_id})
+    instance._menu_category_id = instance.category_id
+
+@receiver(post_save, sender=Category)
+def rebuild_category_menu(sender, instance, **kwargs):
+    schedule_menu_rebuild({instance.pk})
+
+@receiver(post_save, sender=Complement)
+def rebuild_complement_menus(sender, instance, **kwargs):
+    schedule_menu_rebuild(complement_ids={instance.pk})
+
+@receiver(pre_delete, sender=Complement)
+def rebuild_deleted_complement_menus(sender, instance, **kwargs):
+    schedule_menu_rebuild(get_complement_categories([instance.pk]))
+
+@receiver(m2m_changed, sender=Complement.categories.through)
+def rebuild_complement_categories_menus(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        if action.startswith("post_"):
+            schedule_menu_rebuild({instance.pk})
+    elif action == "pre_clear":
+        schedule_menu_rebuild(get_complement_categories([instance.pk]))
+    elif action in ("post_add", "post_remove"):
+        schedule_menu_rebuild(pk_set)
+
+@receiver(connection_created)
+def record_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
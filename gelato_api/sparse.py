@@ -0,0 +1,78 @@
+from functools import cached_property
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+class SparseFieldsSerializerMixin(serializers.Serializer):
+    # properties formatted from a column, so the column is still loaded when they are requested
+    field_columns = {
+        "created": ("created_at",),
+        "updated": ("updated_at",),
+        "image_variants": ("image", "image_variants_ready"),
+        "last_login_date": ("last_login",),
+        "joined": ("date_joined",)
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_columns(cls, model, fields):
+        columns, relations = {model._meta.pk.attname}, set()
+        declared = cls().fields
+        for name in fields:
+            source = declared[name].source
+            if name in cls.field_columns:
+                columns.update(cls.field_columns[name])
+                continue
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(field.attname)
+            else:
+                relations.add(field.name)
+        return columns, relations
+
+class SparseFieldsMixin:
+    fields_query_param = "fields"
+    sparse_actions = ("list", "retrieve")
+
+    @cached_property
+    def sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        return self.get_sparse_fields(self.get_serializer_class())
+
+    def get_sparse_fields(self, serializer_class):
+        if self.fields_query_param not in self.request.query_params:
+            return None
+        fields = [name for name in self.request.query_params[self.fields_query_param].split(",") if name]
+        allowed = {name for name, field in serializer_class().fields.items() if not field.write_only}
+        unknown = [name for name in fields if name not in allowed]
+        if not fields or unknown:
+            raise serializers.ValidationError({self.fields_query_param: [f"Campos inválidos: {', '.join(unknown)}." if unknown else "Informe ao menos um campo."]})
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields = self.sparse_fields
+        if fields:
+            context["fields"] = fields
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.sparse_fields
+        if not fields:
+            return queryset
+        columns, relations = self.get_serializer_class().get_columns(queryset.model, fields)
+        columns.update(field.lstrip("-") for field in queryset.query.order_by)
+        columns.update(getattr(self.pagination_class, "keyset_ordering", ()))
+        lookups = [lookup for lookup in queryset._prefetch_related_lookups if lookup.split("__")[0] in relations]
+        return queryset.prefetch_related(None).prefetch_related(*lookups).only(*columns)
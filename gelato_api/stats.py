@@ -0,0 +1,68 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+
+from .models import Order, DailyOrderStats
+
+STATS_FIELDS = ("created_at", "status", "delivery", "active", "total")
+
+def get_stats_key(values):
+    if any(field not in values for field in STATS_FIELDS):
+        return None
+    return (values["created_at"].date(), values["status"], values["delivery"], values["active"]), Decimal(str(values["total"]))
+
+def add_order_stats(key, orders, total):
+    day, status, delivery, active = key
+    bucket = DailyOrderStats.objects.filter(day=day, status=status, delivery=delivery, active=active)
+    if bucket.update(orders=F("orders") + orders, total=F("total") + total):
+        return
+    try:
+        with transaction.atomic():
+            DailyOrderStats.objects.create(day=day, status=status, delivery=delivery, active=active, orders=orders, total=total)
+    except IntegrityError:
+        bucket.update(orders=F("orders") + orders, total=F("total") + total)
+
+def move_order_stats(previous, current):
+    if previous == current:
+        return
+    if previous is not None:
+        add_order_stats(previous[0], -1, -previous[1])
+    if current is not None:
+        add_order_stats(current[0], 1, current[1])
+
+def rebuild_order_stats(batch_days=30):
+    with transaction.atomic():
+        DailyOrderStats.objects.all().delete()
+        bounds = Order.objects.aggregate(first=Min("created_at"), last=Max("created_at"))
+        if bounds["first"] is None:
+            return 0
+        start = bounds["first"].replace(hour=0, minute=0, second=0, microsecond=0)
+        buckets = 0
+        while start <= bounds["last"]:
+            end = start + timedelta(days=batch_days)
+            rows = (
+                Order.objects.filter(created_at__gte=start, created_at__lt=end)
+                .annotate(day=TruncDate("created_at"))
+                .values("day", "status", "delivery", "active")
+                .annotate(orders=Count("id"), total=Sum("total"))
+                .order_by()
+            )
+            buckets += len(DailyOrderStats.objects.bulk_create([DailyOrderStats(**row) for row in rows]))
+            start = end
+        return buckets
+
+def summarize_order_stats(rows):
+    days = {}
+    for row in rows:
+        day = days.setdefault(row.day, {"day": row.day, "orders": 0, "delivery": 0, "pickup": 0, "active": 0, "total": 0, "statuses": {}})
+        day["orders"] += row.orders
+        day["delivery" if row.delivery else "pickup"] += row.orders
+        day["active"] += row.orders if row.active else 0
+        day["total"] += row.total
+        day["statuses"][row.status] = day["statuses"].get(row.status, 0) + row.orders
+    for day in days.values():
+        day["total"] = f"{day['total']:.2f}"
+    return list(days.values())
@@ -0,0 +1,22 @@
+import os
+from hashlib import sha256
+
+from django.core.files.storage import FileSystemStorage
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, **kwargs):
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def _save(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        name = f"{digest.hexdigest()}{os.path.splitext(name)[1].lower()}"
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+def get_content_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,14 @@
+import sys
+from pytest import fixture
+from django.urls import clear_url_caches
+
+def load_urls():
+    for module in ["root_api.urls", "gelato_api.urls"]:
+        sys.modules.pop(module, None)
+    clear_url_caches()
+
+@fixture
+def reload_urls():
+    # the URLconf reads settings (DEBUG, ASYNC_VIEWS) when imported, reloaded again once the test's overrides are gone
+    yield load_urls
+    load_urls()
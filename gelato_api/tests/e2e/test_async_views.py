@@ -0,0 +1,78 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from pytest import mark, fixture
+from django.test import AsyncClient, override_settings
+from django.urls import resolve
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from gelato_api.models import User, Product, Category, Complement, Order
+
+@fixture(autouse = True)
+def async_views(reload_urls):
+    # as under root_api/asgi.py
+    with override_settings(ASYNC_VIEWS = True):
+        reload_urls()
+        yield
+
+@fixture
+def data():
+    class Data():
+        normal_user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+        superuser = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+        category = Category.objects.create(name = "Ice Cream")
+    for i in range(20):
+        Product.objects.create(name = f"item{i}", price = "12.34", description = "description test", max_complements = 2, category = Data.category, created_by = Data.superuser)
+    Complement.objects.create(name = "candy", increase_value = "1.50", created_by = Data.superuser).categories.set([Data.category])
+    return Data()
+
+@mark.parametrize("url, is_async", [
+    ("/api/v1/products/", True),
+    ("/api/v1/products/1/", True),
+    ("/api/v1/categories/", True),
+    ("/api/v1/complements/1/", True),
+    ("/api/v1/orders/", True),
+    ("/api/v1/orders/1/", False),
+    ("/api/v1/users/", False)
+])
+def test_async_views_routed(url, is_async):
+    assert iscoroutinefunction(resolve(url).func) == is_async
+
+def test_sync_views_routed_without_async_views(reload_urls):
+    with override_settings(ASYNC_VIEWS = False):
+        reload_urls()
+        assert not iscoroutinefunction(resolve("/api/v1/products/").func)
+
+@mark.parametrize("url", [
+    "/api/v1/products/",
+    "/api/v1/products/?page=2&fields=id,name",
+    "/api/v1/products/?page=9",
+    "/api/v1/products/?price_min=abc",
+    "/api/v1/products/1/",
+    "/api/v1/products/999/",
+    "/api/v1/complements/",
+    "/api/v1/categories/1/"
+])
+@mark.django_db
+def test_async_catalog_same_response_as_sync(url, data):
+    sync_response = APIClient().get(url)
+    async_response = async_to_sync(AsyncClient().get)(url)
+    assert async_response.status_code == sync_response.status_code
+    assert async_response.content == sync_response.content
+
+@mark.django_db
+def test_async_POST_order_successful(data):
+    token = AccessToken.for_user(data.normal_user)
+    response = async_to_sync(AsyncClient().post)("/api/v1/orders/", {"comment": "1x Ice Cream 700ml", "delivery": False, "location": "location_test", "items": [{"product": 1, "quantity": 2, "complements": [1]}]}, content_type = "application/json", headers = {"Authorization": f"Bearer {token}"})
+    assert response.status_code == 201
+    assert response.json()["total"] == "27.68"
+    assert Order.objects.get(id = response.json()["id"]).items.count() == 1
+
+@mark.django_db
+def test_async_POST_order_failed_unauthenticated(data):
+    response = async_to_sync(AsyncClient().post)("/api/v1/orders/", {"comment": "1x Ice Cream 700ml", "delivery": False, "location": "location_test"}, content_type = "application/json")
+    assert response.status_code == 401
+
+@mark.parametrize("url", ["/api/v1/products/abc/", "/api/v1/categories/abc/", "/api/v1/complements/abc/"])
+@mark.django_db
+def test_async_retrieve_with_non_numeric_pk_not_found(url, data):
+    response = async_to_sync(AsyncClient().get)(url)
+    assert response.status_code == 404
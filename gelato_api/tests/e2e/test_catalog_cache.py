@@ -0,0 +1,61 @@
+from pytest import mark, fixture
+from rest_framework.test import APIClient
+from gelato_api.models import User, Category, Complement
+from gelato_api.serializers import ProductSerializer, ComplementSerializer
+
+@fixture
+def data():
+    class Data():
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        class Request():
+            user = User.objects.filter(email="staff@user.com").first()
+        category = Category.objects.create(name = "Ice Cream")
+        product1 = ProductSerializer(context = {"request": Request()}, data = {"name": "item1", "price": 12.34, "description": "description test", "max_complements": 3, "category": category.id})
+        product1.is_valid()
+        product1.save()
+        complement1 = ComplementSerializer(context = {"request": Request()}, data = {"name": "candy", "categories": [category.id]})
+        complement1.is_valid()
+        complement1.save()
+    return Data()
+
+@mark.django_db
+def test_GET_products_served_from_cache(data, django_assert_num_queries):
+    client = APIClient()
+    expected_data = client.get("/api/v1/products/").json()
+    with django_assert_num_queries(0):
+        response = client.get("/api/v1/products/")
+    assert response.status_code == 200
+    assert response.json() == expected_data
+
+@mark.django_db
+def test_GET_cache_keyed_by_query_string(data):
+    client = APIClient()
+    client.get("/api/v1/products/")
+    response = client.get("/api/v1/products/?page=2")
+    assert response.status_code == 404
+
+@mark.django_db
+def test_PATCH_product_invalidates_cache(data):
+    client = APIClient()
+    client.get("/api/v1/products/1/")
+    client.force_authenticate(user = data.staff_user)
+    client.patch("/api/v1/products/1/", data = {"name": "item2"}, format = "json")
+    client.force_authenticate(user = None)
+    response = client.get("/api/v1/products/1/")
+    assert response.json()["name"] == "item2"
+
+@mark.django_db
+def test_DELETE_complement_invalidates_cache(data):
+    client = APIClient()
+    assert len(client.get("/api/v1/products/1/complements/").json()) == 1
+    Complement.objects.filter(name = "candy").delete()
+    assert client.get("/api/v1/products/1/complements/").json() == []
+
+@mark.django_db
+def test_complement_categories_change_invalidates_cache(data):
+    client = APIClient()
+    client.get("/api/v1/complements/")
+    category = Category.objects.create(name = "Cake")
+    Complement.objects.get(name = "candy").categories.add(category)
+    response = client.get("/api/v1/complements/")
+    assert response.json()["results"][0]["categories"] == [1, category.id]
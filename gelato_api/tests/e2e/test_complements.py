@@ -38,6 +38,22 @@ def test_GET_specific_complement_successful(data):
     response = client.get("/api/v1/complements/1/")
     assert response.status_code == 200
     assert response.json() == expected_data
+
+@mark.parametrize("query, expected", [
+    ("search=candy2", ["candy2"]),
+    ("category=2", ["cake candy"]),
+    ("price_min=1", ["cake candy"]),
+    ("in_stock=true&ordering=-name", ["candy2", "candy", "cake candy"])
+])
+@mark.django_db
+def test_GET_complements_with_filters_successful(query, expected, data):
+    other_category = Category.objects.create(name = "Cake")
+    complement = Complement.objects.create(name = "cake candy", increase_value = "1.50", created_by = data.superuser)
+    complement.categories.set([other_category])
+    client = APIClient()
+    response = client.get(f"/api/v1/complements/?{query}")
+    assert response.status_code == 200
+    assert [i["name"] for i in response.json()["results"]] == expected
 # DELETE ------------------------------------------------------------------
 @mark.django_db
 def test_DELETE_specific_complement_successful(data):
@@ -102,4 +118,33 @@ def test_PATCH_successful(data):
     complement = ComplementSerializer(Complement.objects.filter(name = "candy3").first())
     expected_data = complement.data
     assert response.status_code == 200
-    assert response.json() == expected_data
\ No newline at end of file
+    assert response.json() == expected_data
+# BULK ------------------------------------------------------------------
+@mark.django_db
+def test_POST_bulk_complements_successful(data, django_assert_max_num_queries):
+    other_category = Category.objects.create(name = "Cake")
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    rows = [{"name": f"candy{i}", "increase_value": "1.00", "categories": [data.category.id, other_category.id]} for i in range(3, 53)]
+    with django_assert_max_num_queries(15):
+        response = client.post("/api/v1/complements/bulk/", data = rows, format = "json")
+    assert response.status_code == 201
+    assert len(response.json()) == 50
+    assert response.json()[0]["categories"] == [data.category.id, other_category.id]
+
+@mark.django_db
+def test_PATCH_bulk_complements_categories_successful(data):
+    other_category = Category.objects.create(name = "Cake")
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.patch("/api/v1/complements/bulk/", data = [{"id": 1, "categories": [other_category.id]}, {"id": 2, "name": "candy3"}], format = "json")
+    assert response.status_code == 200
+    assert [(i["name"], i["categories"]) for i in response.json()] == [("candy", [other_category.id]), ("candy3", [data.category.id])]
+
+@mark.django_db
+def test_PATCH_bulk_complements_failed_unknown_id(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.patch("/api/v1/complements/bulk/", data = [{"id": 1, "name": "candy3"}, {"id": 999, "name": "candy4"}], format = "json")
+    assert response.status_code == 400
+    assert response.json() == [{}, {"id": ["Objeto não encontrado."]}]
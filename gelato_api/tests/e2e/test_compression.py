@@ -0,0 +1,41 @@
+import gzip
+from pytest import mark, fixture
+from rest_framework.test import APIClient
+from gelato_api.middleware import brotli
+from gelato_api.models import User, Product, Category
+
+@fixture
+def data():
+    class Data():
+        superuser = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+        category = Category.objects.create(name = "Ice Cream")
+    for i in range(15):
+        Product.objects.create(name = f"item{i}", price = 10, description = "description test", max_complements = 3, category = Data.category, created_by = Data.superuser)
+    return Data()
+
+@mark.django_db
+def test_GET_products_compressed_with_gzip(data):
+    client = APIClient()
+    plain = client.get("/api/v1/products/")
+    response = client.get("/api/v1/products/", HTTP_ACCEPT_ENCODING = "gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert response["ETag"] == f"W/{plain['ETag']}"
+    assert len(response.content) < len(plain.content)
+    assert gzip.decompress(response.content) == plain.content
+
+@mark.skipif(brotli is None, reason = "brotli is not installed")
+@mark.django_db
+def test_GET_products_compressed_with_brotli(data):
+    client = APIClient()
+    plain = client.get("/api/v1/products/")
+    response = client.get("/api/v1/products/", HTTP_ACCEPT_ENCODING = "gzip, br")
+    assert response["Content-Encoding"] == "br"
+    assert brotli.decompress(response.content) == plain.content
+
+@mark.django_db
+def test_GET_small_response_not_compressed(data):
+    client = APIClient()
+    response = client.get("/api/v1/categories/", HTTP_ACCEPT_ENCODING = "gzip, br")
+    assert not response.has_header("Content-Encoding")
+    assert response.json()["count"] == 1
@@ -0,0 +1,74 @@
+from pytest import mark, fixture
+from rest_framework.test import APIClient
+from gelato_api.models import User, Category, Complement, Order
+from gelato_api.serializers import ProductSerializer, ComplementSerializer
+
+@fixture
+def data():
+    class Data():
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        class Request():
+            user = User.objects.filter(email="staff@user.com").first()
+        category = Category.objects.create(name = "Ice Cream")
+        product1 = ProductSerializer(context = {"request": Request()}, data = {"name": "item1", "price": 12.34, "description": "description test", "max_complements": 3, "category": category.id})
+        product1.is_valid()
+        product1.save()
+        complement1 = ComplementSerializer(context = {"request": Request()}, data = {"name": "candy", "categories": [category.id]})
+        complement1.is_valid()
+        complement1.save()
+        order1 = Order.objects.create(user = staff_user, comment = "1x Ice Cream 700ml", delivery = False, location = "location_test")
+    return Data()
+
+@mark.parametrize("url", ["/api/v1/products/", "/api/v1/products/1/", "/api/v1/categories/", "/api/v1/categories/1/", "/api/v1/complements/", "/api/v1/complements/1/"])
+@mark.django_db
+def test_GET_catalog_with_etag_not_modified(url, data, django_assert_num_queries):
+    client = APIClient()
+    response = client.get(url)
+    assert response.status_code == 200
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH = response["ETag"])
+    assert response.status_code == 304
+    assert response.content == b""
+
+@mark.django_db
+def test_GET_products_with_last_modified_not_modified(data):
+    client = APIClient()
+    response = client.get("/api/v1/products/")
+    response = client.get("/api/v1/products/", HTTP_IF_MODIFIED_SINCE = response["Last-Modified"])
+    assert response.status_code == 304
+
+@mark.django_db
+def test_GET_orders_etag_changes_with_status(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    etag = client.get("/api/v1/orders/1/")["ETag"]
+    client.patch("/api/v1/orders/1/", data = {"status": "Entregue"}, format = "json")
+    response = client.get("/api/v1/orders/1/", HTTP_IF_NONE_MATCH = etag)
+    assert response.status_code == 200
+    assert response.json()["status"] == "Entregue"
+
+@mark.django_db
+def test_GET_complements_etag_changes_with_categories(data):
+    client = APIClient()
+    etag = client.get("/api/v1/complements/")["ETag"]
+    Complement.objects.get(name = "candy").categories.add(Category.objects.create(name = "Cake"))
+    response = client.get("/api/v1/complements/", HTTP_IF_NONE_MATCH = etag)
+    assert response.status_code == 200
+
+@mark.parametrize("url", ["/api/v1/categories/", "/api/v1/categories/1/"])
+@mark.django_db
+def test_GET_categories_etag_changes_with_bulk_update(url, data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    etag = client.get(url)["ETag"]
+    client.patch("/api/v1/categories/bulk/", data = [{"id": 1, "name": "Gelato"}], format = "json")
+    response = client.get(url, HTTP_IF_NONE_MATCH = etag)
+    assert response.status_code == 200
+    assert "Gelato" in response.content.decode()
+
+@mark.parametrize("url", ["/api/v1/products/abc/", "/api/v1/categories/abc/", "/api/v1/complements/abc/", "/api/v1/orders/abc/"])
+@mark.django_db
+def test_GET_retrieve_with_non_numeric_pk_not_found(url, data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    assert client.get(url).status_code == 404
@@ -0,0 +1,121 @@
+from io import BytesIO
+from pytest import mark, fixture
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APIClient
+from gelato_api import images
+from gelato_api.models import User, Category, Product
+
+@fixture
+def data(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    # variants generated after the commit in the same thread, a worker would not see the test transaction
+    settings.IMAGE_WORKERS = 0
+    class Data():
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        category = Category.objects.create(name = "Ice Cream")
+    return Data()
+
+def upload_file(name = "menu.png", size = (1200, 800)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type = "image/png")
+
+@mark.django_db
+def test_POST_product_with_image_generates_variants(data, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    with django_capture_on_commit_callbacks(execute = True):
+        response = client.post("/api/v1/products/", data = {"name": "item1", "price": 12.34, "description": "description test", "max_complements": 3, "category": data.category.id, "image": upload_file()}, format = "multipart")
+    assert response.status_code == 201
+    name = Product.objects.get(name = "item1").image.name
+    assert response.json()["image_variants"] == {"thumbnail": response.json()["image"], "small": response.json()["image"]}
+    response = client.get("/api/v1/products/1/")
+    for variant, size in images.IMAGE_VARIANTS.items():
+        with default_storage.open(images.variant_name(name, variant)) as file:
+            variant_image = Image.open(file)
+            assert variant_image.format == "WEBP"
+            assert max(variant_image.size) == size
+        assert response.json()["image_variants"][variant].endswith(images.variant_name(name, variant))
+
+@mark.django_db
+def test_PATCH_product_image_falls_back_until_variants_exist(data, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    with django_capture_on_commit_callbacks(execute = True):
+        client.post("/api/v1/products/", data = {"name": "item1", "price": 12.34, "description": "description test", "max_complements": 3, "category": data.category.id, "image": upload_file()}, format = "multipart")
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = client.patch("/api/v1/products/1/", data = {"image": upload_file(size = (10, 10))}, format = "multipart")
+    assert set(response.json()["image_variants"].values()) == {response.json()["image"]}
+    assert set(client.get("/api/v1/products/").json()["results"][0]["image_variants"].values()) == {response.json()["image"]}
+    for callback in callbacks:
+        callback()
+    name = Product.objects.get(name = "item1").image.name
+    assert client.get("/api/v1/products/").json()["results"][0]["image_variants"]["small"].endswith(images.variant_name(name, "small"))
+
+@mark.django_db
+def test_GET_product_without_image_has_no_variants(data):
+    Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user)
+    response = APIClient().get("/api/v1/products/1/")
+    assert response.json()["image_variants"] is None
+
+@mark.django_db
+def test_same_image_is_stored_once(data):
+    product1 = Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file("a.png"))
+    product2 = Product.objects.create(name = "item2", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file("b.PNG"))
+    assert product1.image.name == product2.image.name
+    assert product1.image.name.endswith(".png")
+    assert len(default_storage.listdir("")[1]) == 1
+
+@mark.django_db
+def test_orphan_image_is_collected(data, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute = True):
+        product1 = Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file())
+        product2 = Product.objects.create(name = "item2", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file())
+    name = product1.image.name
+    with django_capture_on_commit_callbacks(execute = True):
+        product1.delete()
+    assert default_storage.exists(name)
+    with django_capture_on_commit_callbacks(execute = True):
+        product2.image = upload_file(size = (10, 10))
+        product2.save()
+    assert not default_storage.exists(name)
+    assert not default_storage.exists(images.variant_name(name, "small"))
+    assert default_storage.exists(product2.image.name)
+
+@mark.django_db
+def test_GET_media_with_cache_headers(data, reload_urls):
+    product = Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file())
+    client = APIClient()
+    with override_settings(DEBUG = True):
+        reload_urls()
+        response = client.get(f"/media/{product.image.name}")
+        assert response.status_code == 200
+        assert response["ETag"] == f'"{product.image.name.split(".")[0]}"'
+        assert "immutable" in response["Cache-Control"]
+        response = client.get(f"/media/{product.image.name}", HTTP_IF_NONE_MATCH = response["ETag"])
+        assert response.status_code == 304
+
+@mark.django_db
+def test_GET_media_failed_missing_file(data, reload_urls):
+    with override_settings(DEBUG = True):
+        reload_urls()
+        response = APIClient().get("/media/0123abcd.png", HTTP_IF_NONE_MATCH = '"0123abcd"')
+    assert response.status_code == 404
+
+@mark.django_db
+def test_GET_media_not_served_without_debug(data, reload_urls):
+    product = Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = upload_file())
+    reload_urls()
+    assert APIClient().get(f"/media/{product.image.name}").status_code == 404
+
+@mark.django_db
+def test_generate_image_variants_command(data):
+    name = default_storage.save("menu.png", upload_file())
+    product = Product.objects.create(name = "item1", price = 10, description = "description test", max_complements = 3, category = data.category, created_by = data.staff_user, image = name)
+    call_command("generate_image_variants")
+    assert Product.objects.get(pk = product.pk).image_variants_ready
+    assert default_storage.exists(images.variant_name(name, "small"))
@@ -0,0 +1,122 @@
+from pytest import mark, fixture
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from gelato_api.models import User, Product, Category, Complement, CategoryMenu
+
+@fixture
+def data(django_capture_on_commit_callbacks):
+    class Data():
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+    with django_capture_on_commit_callbacks(execute = True):
+        Data.ice_cream = Category.objects.create(name = "Ice Cream")
+        Data.cake = Category.objects.create(name = "Cake")
+        Data.product1 = Product.objects.create(name = "item1", price = "12.34", description = "description test", max_complements = 2, category = Data.ice_cream, created_by = Data.staff_user)
+        Data.product2 = Product.objects.create(name = "item2", price = "9.00", description = "description test", max_complements = 1, category = Data.cake, created_by = Data.staff_user)
+        Data.complement = Complement.objects.create(name = "candy", increase_value = "1.50", created_by = Data.staff_user)
+        Data.complement.categories.set([Data.ice_cream, Data.cake])
+    return Data()
+
+def staff_client(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    return client
+
+def get_menu(category):
+    return CategoryMenu.objects.get(category = category).document
+
+@mark.django_db
+def test_GET_menu_successful(data, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        response = APIClient().get("/api/v1/menu/")
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": data.ice_cream.id, "name": "Ice Cream", "products": [
+            {"id": data.product1.id, "name": "item1", "price": "12.34", "description": "description test", "image": None, "image_variants": None, "max_complements": 2, "complements": [
+                {"id": data.complement.id, "name": "candy", "increase_value": "1.50", "image": None}
+            ]}
+        ]},
+        {"id": data.cake.id, "name": "Cake", "products": [
+            {"id": data.product2.id, "name": "item2", "price": "9.00", "description": "description test", "image": None, "image_variants": None, "max_complements": 1, "complements": [
+                {"id": data.complement.id, "name": "candy", "increase_value": "1.50", "image": None}
+            ]}
+        ]}
+    ]
+
+@mark.django_db
+def test_GET_menu_category_successful(data, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = APIClient().get(f"/api/v1/menu/{data.cake.id}/")
+    assert response.status_code == 200
+    assert response.json() == get_menu(data.cake)
+
+@mark.django_db
+def test_GET_menu_category_failed_not_found(data):
+    assert APIClient().get("/api/v1/menu/999/").status_code == 404
+    assert APIClient().get("/api/v1/menu/abc/").status_code == 404
+
+@mark.django_db
+def test_GET_menu_catalog_throttle(data):
+    client = APIClient()
+    assert [client.get("/api/v1/menu/").status_code for i in range(10)] == [200] * 10
+    assert [client.get("/api/v1/menu/1/").status_code for i in range(10)] == [200] * 10
+
+@mark.django_db
+def test_menu_rebuilt_on_product_changes(data, django_capture_on_commit_callbacks):
+    client = staff_client(data)
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/products/{data.product1.id}/", data = {"price": "15.00"}, format = "json")
+    assert get_menu(data.ice_cream)["products"][0]["price"] == "15.00"
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/products/{data.product1.id}/", data = {"category": data.cake.id}, format = "json")
+    assert get_menu(data.ice_cream)["products"] == []
+    assert [i["id"] for i in get_menu(data.cake)["products"]] == [data.product1.id, data.product2.id]
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/products/{data.product2.id}/", data = {"in_stock": False}, format = "json")
+    assert [i["id"] for i in get_menu(data.cake)["products"]] == [data.product1.id]
+    with django_capture_on_commit_callbacks(execute = True):
+        client.delete(f"/api/v1/products/{data.product1.id}/")
+    assert get_menu(data.cake)["products"] == []
+
+@mark.django_db
+def test_menu_rebuilt_on_complement_changes(data, django_capture_on_commit_callbacks):
+    client = staff_client(data)
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/complements/{data.complement.id}/", data = {"increase_value": "2.00"}, format = "json")
+    assert get_menu(data.ice_cream)["products"][0]["complements"][0]["increase_value"] == "2.00"
+    assert get_menu(data.cake)["products"][0]["complements"][0]["increase_value"] == "2.00"
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/complements/{data.complement.id}/", data = {"categories": [data.cake.id]}, format = "json")
+    assert get_menu(data.ice_cream)["products"][0]["complements"] == []
+    assert len(get_menu(data.cake)["products"][0]["complements"]) == 1
+    with django_capture_on_commit_callbacks(execute = True):
+        client.delete(f"/api/v1/complements/{data.complement.id}/")
+    assert get_menu(data.cake)["products"][0]["complements"] == []
+
+@mark.django_db
+def test_menu_rebuilt_on_category_changes(data, django_capture_on_commit_callbacks):
+    client = staff_client(data)
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch(f"/api/v1/categories/{data.cake.id}/", data = {"name": "Pie"}, format = "json")
+    assert get_menu(data.cake)["name"] == "Pie"
+    with django_capture_on_commit_callbacks(execute = True):
+        client.delete(f"/api/v1/categories/{data.cake.id}/")
+    assert not CategoryMenu.objects.filter(category_id = data.cake.id).exists()
+    assert APIClient().get(f"/api/v1/menu/{data.cake.id}/").status_code == 404
+
+@mark.django_db
+def test_menu_rebuilt_on_bulk_changes(data, django_capture_on_commit_callbacks):
+    client = staff_client(data)
+    with django_capture_on_commit_callbacks(execute = True):
+        client.patch("/api/v1/products/bulk/", data = [{"id": data.product1.id, "category": data.cake.id}, {"id": data.product2.id, "price": "1.00"}], format = "json")
+    assert get_menu(data.ice_cream)["products"] == []
+    assert [(i["id"], i["price"]) for i in get_menu(data.cake)["products"]] == [(data.product1.id, "12.34"), (data.product2.id, "1.00")]
+    with django_capture_on_commit_callbacks(execute = True):
+        client.post("/api/v1/products/bulk/", data = [{"name": "item3", "price": "3.00", "description": "description test", "max_complements": 1, "category": data.ice_cream.id}], format = "json")
+    assert [i["name"] for i in get_menu(data.ice_cream)["products"]] == ["item3"]
+
+@mark.django_db
+def test_rebuild_menus_command(data):
+    CategoryMenu.objects.all().delete()
+    call_command("rebuild_menus")
+    assert CategoryMenu.objects.count() == 2
+    assert get_menu(data.ice_cream)["products"][0]["name"] == "item1"
@@ -0,0 +1,96 @@
+from asgiref.sync import async_to_sync
+from pytest import mark, fixture
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from gelato_api.models import User, Product, Category, Complement
+
+@fixture
+def data():
+    class Data():
+        normal_user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        category = Category.objects.create(name = "Ice Cream")
+        product = Product.objects.create(name = "item1", price = "12.34", description = "description test", max_complements = 2, category = category, created_by = staff_user)
+    Complement.objects.create(name = "candy", increase_value = "1.50", created_by = Data.staff_user).categories.set([Data.category])
+    return Data()
+
+def get_sample(client, name):
+    response = client.get("/api/v1/metrics/")
+    for line in response.content.decode().splitlines():
+        if line.rsplit(" ", 1)[0] == name:
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+def staff_client(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    return client
+
+@mark.django_db
+def test_GET_metrics_successful(data):
+    client = staff_client(data)
+    response = client.get("/api/v1/metrics/")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE gelato_request_duration_seconds histogram" in response.content.decode()
+
+@mark.django_db
+def test_GET_metrics_not_throttled(data):
+    client = staff_client(data)
+    assert [client.get("/api/v1/metrics/").status_code for i in range(20)] == [200] * 20
+
+@mark.django_db
+def test_GET_metrics_failed_not_staff(data):
+    assert APIClient().get("/api/v1/metrics/").status_code == 401
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    assert client.get("/api/v1/metrics/").status_code == 403
+
+@mark.parametrize("url, route", [
+    ("/api/v1/products/", "ProductViewSet.list"),
+    ("/api/v1/products/1/", "ProductViewSet.retrieve"),
+    ("/api/v1/products/1/complements/", "ProductViewSet.complements"),
+    ("/api/v1/orders/", "OrderViewSet.list"),
+    ("/api/v1/users/2/", "UserViewSet.retrieve")
+])
+@mark.django_db
+def test_metrics_recorded_per_route(url, route, data):
+    client = staff_client(data)
+    labels = f'{{route="{route}",method="GET"}}'
+    count = get_sample(client, f"gelato_request_duration_seconds_count{labels}")
+    queries = get_sample(client, f"gelato_request_db_queries_sum{labels}")
+    serializer_seconds = get_sample(client, f"gelato_request_serializer_duration_seconds_sum{labels}")
+    response = client.get(url, HTTP_ACCEPT_ENCODING = "identity")
+    assert response.status_code == 200
+    assert get_sample(client, f"gelato_request_duration_seconds_count{labels}") == count + 1
+    assert get_sample(client, f"gelato_request_db_queries_sum{labels}") > queries
+    assert get_sample(client, f"gelato_request_serializer_duration_seconds_sum{labels}") > serializer_seconds
+    assert get_sample(client, f"gelato_response_size_bytes_count{labels}") >= 1
+    assert get_sample(client, f'gelato_requests_total{{route="{route}",method="GET",status="200"}}') >= 1
+
+@mark.django_db
+def test_metrics_route_for_plain_views(data):
+    client = staff_client(data)
+    client.get("/api/v1/metrics/")
+    assert get_sample(client, 'gelato_request_duration_seconds_count{route="gelato_api.views.metrics",method="GET"}') >= 1
+
+@mark.django_db
+def test_slow_query_log(data, settings, caplog):
+    settings.SLOW_QUERY_MS = 0
+    with caplog.at_level("WARNING", logger = "gelato_api.slow_queries"):
+        APIClient().get("/api/v1/products/1/")
+    assert any("ProductViewSet.retrieve" in record.getMessage() for record in caplog.records)
+    caplog.clear()
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+    with caplog.at_level("WARNING", logger = "gelato_api.slow_queries"):
+        APIClient().get("/api/v1/products/1/")
+    assert not caplog.records
+
+@mark.django_db
+def test_metrics_recorded_for_async_views(data):
+    client = staff_client(data)
+    labels = '{route="ProductViewSet.list",method="GET"}'
+    queries = get_sample(client, f"gelato_request_db_queries_sum{labels}")
+    response = async_to_sync(AsyncClient().get)("/api/v1/products/")
+    assert response.status_code == 200
+    assert get_sample(client, f"gelato_request_db_queries_sum{labels}") > queries
@@ -0,0 +1,74 @@
+import asyncio
+import json
+from pytest import mark, fixture, raises
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+from gelato_api.events import Broker, get_broker
+from gelato_api.models import User, Order
+from gelato_api.serializers import OrderSerializer
+
+@fixture
+def data():
+    class Data():
+        normal_user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        class Request():
+            user = User.objects.filter(email="normal@user.com").first()
+    return Data()
+
+@fixture
+def subscriber():
+    loop = asyncio.new_event_loop()
+    stream = get_broker().stream()
+    loop.run_until_complete(stream.__anext__())
+    def receive():
+        message = loop.run_until_complete(stream.__anext__())
+        event, data = message.strip().split("\n")
+        return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+    yield receive
+    loop.run_until_complete(stream.aclose())
+    loop.close()
+
+@mark.django_db
+def test_order_creation_is_published(data, subscriber, django_capture_on_commit_callbacks):
+    serializer = OrderSerializer(context = {"request": data.Request()}, data = {"comment": "1x Ice Cream 700ml", "delivery": False, "location": "location_test"})
+    serializer.is_valid()
+    with django_capture_on_commit_callbacks(execute = True):
+        order = serializer.save()
+    event, payload = subscriber()
+    assert event == "created"
+    assert payload["id"] == order.id
+    assert payload["status"] == "Pedido solicitado"
+
+@mark.django_db
+def test_order_status_change_is_published(data, subscriber, django_capture_on_commit_callbacks):
+    order = Order.objects.create(user = data.normal_user, comment = "1x Ice Cream 700ml", delivery = False, location = "location_test", status = "Pedido solicitado")
+    with django_capture_on_commit_callbacks(execute = True):
+        serializer = OrderSerializer(order, data = {"location": "location_test2"}, partial = True)
+        serializer.is_valid()
+        serializer.save()
+        serializer = OrderSerializer(order, data = {"status": "Saiu para entrega"}, partial = True)
+        serializer.is_valid()
+        serializer.save()
+    event, payload = subscriber()
+    assert event == "updated"
+    assert payload["status"] == "Saiu para entrega"
+    assert payload["location"] == "location_test2"
+
+@mark.django_db
+def test_GET_order_events_without_authentication_failed():
+    response = Client().get("/api/v1/orders/events/")
+    assert response.status_code == 401
+
+@mark.django_db
+def test_GET_order_events_with_normal_user_failed(data):
+    token = AccessToken.for_user(data.normal_user)
+    response = Client().get("/api/v1/orders/events/", HTTP_AUTHORIZATION = f"Bearer {token}")
+    assert response.status_code == 403
+
+def test_broker_requires_publish_and_listen():
+    class PublishOnlyBroker(Broker):
+        def publish(self, message):
+            pass
+    with raises(TypeError):
+        PublishOnlyBroker()
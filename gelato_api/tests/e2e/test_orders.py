@@ -1,6 +1,11 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from pytest import mark, fixture
 from rest_framework.test import APIClient
-from gelato_api.models import User, Order
+from gelato_api.models import User, Order, Product, Category, Complement
 from gelato_api.serializers import OrderSerializer
 
 @fixture
@@ -19,6 +24,22 @@ def data():
         order2.save()
     return Data()
 
+@fixture
+def menu(data):
+    class Menu():
+        category = Category.objects.create(name = "Ice Cream")
+        other_category = Category.objects.create(name = "Cake")
+        product = Product.objects.create(name = "item1", price = "10.00", description = "description test", max_complements = 2, category = category, created_by = data.superuser)
+        complement1 = Complement.objects.create(name = "candy", increase_value = "1.50", created_by = data.superuser)
+        complement2 = Complement.objects.create(name = "candy2", increase_value = "2.00", created_by = data.superuser)
+        complement3 = Complement.objects.create(name = "candy3", increase_value = "3.00", created_by = data.superuser)
+        complement4 = Complement.objects.create(name = "cake candy", increase_value = "1.00", created_by = data.superuser)
+        complement1.categories.set([category])
+        complement2.categories.set([category])
+        complement3.categories.set([category])
+        complement4.categories.set([other_category])
+    return Menu()
+
 # GET ------------------------------------------------------------------
 @mark.django_db
 def test_GET_all_orders_successful(data):
@@ -31,6 +52,80 @@ def test_GET_all_orders_successful(data):
     assert response.status_code == 200
     assert response.json()["results"] == expected_data
 
+@mark.django_db
+def test_GET_all_orders_with_cursor_pagination(data):
+    for i in range(20):
+        Order.objects.create(user = data.normal_user, comment = f"{i}x Ice Cream 700ml", delivery = False, location = "location_test")
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/?pagination=cursor")
+    assert response.status_code == 200
+    assert "count" not in response.json()
+    first_page = [i["id"] for i in response.json()["results"]]
+    Order.objects.create(user = data.normal_user, comment = "new order", delivery = False, location = "location_test")
+    response = client.get(response.json()["next"])
+    second_page = [i["id"] for i in response.json()["results"]]
+    assert first_page + second_page == list(Order.objects.order_by("created_at", "id").values_list("id", flat = True))
+
+@mark.django_db
+def test_GET_all_orders_with_cursor_pagination_without_count(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/api/v1/orders/?pagination=cursor")
+    assert response.status_code == 200
+    assert not [query["sql"] for query in context.captured_queries if "COUNT(" in query["sql"].upper()]
+
+@mark.parametrize("mode, status_code", [("page", 200), ("curser", 400), ("", 400)])
+@mark.django_db
+def test_GET_all_orders_pagination_mode(mode, status_code, data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get(f"/api/v1/orders/?pagination={mode}")
+    assert response.status_code == status_code
+    if status_code == 400:
+        assert "pagination" in response.json()
+
+@mark.django_db
+def test_GET_all_orders_with_cursor_pagination_failed_ordering(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/?pagination=cursor&ordering=-created_at")
+    assert response.status_code == 400
+    assert "ordering" in response.json()
+
+@mark.parametrize("query, expected", [
+    ("status=Em preparo", [2]),
+    ("active=false", [1]),
+    ("created_from=2024-01-01&created_to=2024-01-31", [1]),
+    ("ordering=-created_at", [2, 1])
+])
+@mark.django_db
+def test_GET_orders_with_filters_successful(query, expected, data):
+    Order.objects.filter(id = 1).update(active = False, created_at = "2024-01-10 12:00:00")
+    Order.objects.filter(id = 2).update(status = "Em preparo")
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get(f"/api/v1/orders/?{query}")
+    assert response.status_code == 200
+    assert [i["id"] for i in response.json()["results"]] == expected
+
+@mark.django_db
+def test_GET_orders_with_sparse_fields_skips_items(data, django_assert_num_queries):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1/orders/?fields=id,status")
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": 1, "status": "Pedido solicitado"}, {"id": 2, "status": "Pedido solicitado"}]
+
+@mark.django_db
+def test_GET_orders_failed_invalid_date_range(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/?created_from=2024-02-01&created_to=2024-01-01")
+    assert response.status_code == 400
+
 @mark.django_db
 def test_GET_specific_order_successful(data):
     expected_data = data.order1.data
@@ -67,6 +162,46 @@ def test_POST_order_failed_required_field(field, data):
     response = client.post("/api/v1/orders/", data = expected_data, format = "json")
     assert response.status_code == 400
     assert list(response.json().keys()) == [field]
+@mark.django_db
+def test_POST_order_with_items_computes_total(data, menu):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    items = [
+        {"product": menu.product.id, "quantity": 2, "complements": [menu.complement1.id, menu.complement2.id]},
+        {"product": menu.product.id, "quantity": 1}
+    ]
+    response = client.post("/api/v1/orders/", data = {"comment": "Pagamento no pix", "delivery": False, "location": "location_test", "items": items}, format = "json")
+    assert response.status_code == 201
+    assert response.json()["total"] == "37.00"
+    assert [(i["unit_price"], i["total"], i["complements"]) for i in response.json()["items"]] == [
+        ("13.50", "27.00", [menu.complement1.id, menu.complement2.id]),
+        ("10.00", "10.00", [])
+    ]
+    assert Order.objects.get(id = response.json()["id"]).items.count() == 2
+
+@mark.django_db
+def test_POST_order_with_items_validates_in_batch(data, menu, django_assert_max_num_queries):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    items = [{"product": menu.product.id, "quantity": 1, "complements": [menu.complement1.id]} for i in range(20)]
+    with django_assert_max_num_queries(15):
+        response = client.post("/api/v1/orders/", data = {"comment": "-", "delivery": False, "location": "location_test", "items": items}, format = "json")
+    assert response.status_code == 201
+
+@mark.parametrize("item", [
+    {"product": 999, "quantity": 1},
+    {"product": 1, "quantity": 1, "complements": [1, 2, 3]},
+    {"product": 1, "quantity": 1, "complements": [4]},
+    {"product": 1, "quantity": 1, "complements": [999]}
+])
+@mark.django_db
+def test_POST_order_failed_invalid_item(item, data, menu):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    response = client.post("/api/v1/orders/", data = {"comment": "-", "delivery": False, "location": "location_test", "items": [item]}, format = "json")
+    assert response.status_code == 400
+    assert list(response.json().keys()) == ["items"]
+    assert Order.objects.count() == 2
 # PUT ------------------------------------------------------------------
 @mark.django_db
 def test_PUT_order_successful(data):
@@ -97,4 +232,66 @@ def test_PATCH_successful(data):
     order = OrderSerializer(Order.objects.filter(id = 1).first())
     expected_data = order.data
     assert response.status_code == 200
-    assert response.json() == expected_data
\ No newline at end of file
+    assert response.json() == expected_data
+# EXPORT ------------------------------------------------------------------
+@mark.django_db
+def test_GET_export_orders_csv_successful(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/export/")
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv"
+    assert lines[0] == "id,user,email,comment,delivery,location,status,active,total,created"
+    assert len(lines) == 3
+    assert lines[1].startswith("1,3,super@user.com,1x Ice Cream 700ml,False,location_test,Pedido solicitado,True,0.00,")
+
+@mark.django_db
+def test_GET_export_orders_ndjson_with_filters_successful(data):
+    Order.objects.filter(id = 2).update(status = "Entregue", active = False)
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/export/?output=ndjson&status=Entregue&active=false&created_from=2000-01-01")
+    rows = [json.loads(i) for i in b"".join(response.streaming_content).decode().splitlines()]
+    assert response.status_code == 200
+    assert [(i["id"], i["status"], i["active"]) for i in rows] == [(2, "Entregue", False)]
+
+@mark.django_db
+def test_GET_export_orders_failed_invalid_filter(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/export/?created_from=yesterday")
+    assert response.status_code == 400
+    assert list(response.json().keys()) == ["created_from"]
+
+@mark.django_db
+def test_GET_export_orders_with_normal_user_failed(data):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    response = client.get("/api/v1/orders/export/")
+    assert response.status_code == 403
+
+# STATS ------------------------------------------------------------------
+@mark.django_db
+def test_GET_order_stats_updated_incrementally(data, menu):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    client.post("/api/v1/orders/", data = {"comment": "-", "delivery": True, "location": "location_test", "items": [{"product": menu.product.id, "quantity": 2}]}, format = "json")
+    client.patch("/api/v1/orders/1/", data = {"status": "Entregue", "active": False}, format = "json")
+    Order.objects.get(id = 2).delete()
+    response = client.get("/api/v1/orders/stats/")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    day = response.json()[0]
+    assert (day["orders"], day["delivery"], day["pickup"], day["active"], day["total"]) == (2, 1, 1, 1, "20.00")
+    assert day["statuses"] == {"Entregue": 1, "Pedido solicitado": 1}
+
+@mark.django_db
+def test_rebuild_order_stats_matches_incremental(data):
+    Order.objects.create(user = data.normal_user, comment = "-", delivery = True, location = "location_test", status = "Entregue", active = False, total = "5.50")
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    expected_data = client.get("/api/v1/orders/stats/").json()
+    call_command("rebuild_order_stats", batch_days = 1, stdout = StringIO())
+    assert client.get("/api/v1/orders/stats/").json() == expected_data
+    assert expected_data[0]["orders"] == 3
@@ -1,4 +1,5 @@
 from pytest import mark, fixture
+from decimal import Decimal
 from rest_framework.test import APIClient
 from gelato_api.models import User, Product, Category
 from gelato_api.serializers import ProductSerializer, ComplementSerializer
@@ -52,6 +53,53 @@ def test_GET_complements_from_specific_product_successful(data):
     response = client.get("/api/v1/products/1/complements/")
     assert response.status_code == 200
     assert response.json() == expected_data
+
+@mark.django_db
+def test_GET_complements_from_specific_product_with_sparse_fields_successful(data):
+    client = APIClient()
+    response = client.get("/api/v1/products/1/complements/?fields=id,name")
+    assert response.status_code == 200
+    assert response.json() == [{"id": i["id"], "name": i["name"]} for i in [data.complement1.data, data.complement2.data]]
+    assert client.get("/api/v1/products/1/complements/?fields=id,price").status_code == 400
+@mark.django_db
+def test_GET_products_with_sparse_fields_successful(data, django_assert_max_num_queries):
+    client = APIClient()
+    with django_assert_max_num_queries(3) as queries:
+        response = client.get("/api/v1/products/?fields=id,name,price")
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"id": 1, "name": "item1", "price": "12.34"}, {"id": 2, "name": "item2", "price": "13.54"}]
+    assert "description" not in queries.captured_queries[-1]["sql"]
+
+@mark.parametrize("query", ["fields=id,password", "fields=,"])
+@mark.django_db
+def test_GET_products_failed_invalid_sparse_fields(query, data):
+    client = APIClient()
+    response = client.get(f"/api/v1/products/?{query}")
+    assert response.status_code == 400
+
+@mark.parametrize("query, expected", [
+    ("search=ITEM2", ["item2"]),
+    ("price_min=13&price_max=14", ["item2"]),
+    ("in_stock=false", ["item1"]),
+    ("category=2", ["item3"]),
+    ("ordering=-price", ["item2", "item1", "item3"])
+])
+@mark.django_db
+def test_GET_products_with_filters_successful(query, expected, data):
+    Product.objects.filter(id = 1).update(in_stock = False)
+    other_category = Category.objects.create(name = "Cake")
+    Product.objects.create(name = "item3", price = 5, description = "description test", max_complements = 3, category = other_category, created_by = data.superuser)
+    client = APIClient()
+    response = client.get(f"/api/v1/products/?{query}")
+    assert response.status_code == 200
+    assert [i["name"] for i in response.json()["results"]] == expected
+
+@mark.parametrize("query", ["price_min=10&price_max=5", "in_stock=maybe", "category=abc", "ordering=description"])
+@mark.django_db
+def test_GET_products_failed_invalid_filter(query, data):
+    client = APIClient()
+    response = client.get(f"/api/v1/products/?{query}")
+    assert response.status_code == 400
 # DELETE ------------------------------------------------------------------
 @mark.django_db
 def test_DELETE_specific_product_successful(data):
@@ -113,4 +161,62 @@ def test_PATCH_product_successful(data):
     product = ProductSerializer(Product.objects.filter(id = 1).first())
     expected_data = product.data
     assert response.status_code == 200
-    assert response.json() == expected_data
\ No newline at end of file
+    assert response.json() == expected_data
+# BULK ------------------------------------------------------------------
+@mark.django_db
+def test_POST_bulk_products_successful(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    rows = [{"name": f"item{i}", "price": 10, "description": "description test", "max_complements": 2, "category": data.category.id} for i in range(3, 6)]
+    response = client.post("/api/v1/products/bulk/", data = rows, format = "json")
+    assert response.status_code == 201
+    assert [i["name"] for i in response.json()] == ["item3", "item4", "item5"]
+    assert set(Product.objects.filter(name__in = ["item3", "item4", "item5"]).values_list("created_by", flat = True)) == {data.staff_user.id}
+
+@mark.django_db
+def test_POST_bulk_products_failed_reports_row_errors(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    rows = [
+        {"name": "item3", "price": 10, "description": "description test", "max_complements": 2, "category": data.category.id},
+        {"name": "item1", "price": 10, "description": "description test", "max_complements": 2, "category": data.category.id},
+        {"name": "item4", "price": 10, "description": "description test", "max_complements": 2, "category": 999},
+        {"name": "item3", "price": 10, "description": "description test", "max_complements": 2, "category": data.category.id}
+    ]
+    response = client.post("/api/v1/products/bulk/", data = rows, format = "json")
+    assert response.status_code == 400
+    assert [list(i.keys()) for i in response.json()] == [[], ["name"], ["category"], ["name"]]
+    assert Product.objects.count() == 2
+
+@mark.django_db
+def test_PATCH_bulk_products_successful(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.patch("/api/v1/products/bulk/", data = [{"id": 1, "price": "1.00"}, {"id": 2, "in_stock": False}], format = "json")
+    assert response.status_code == 200
+    assert response.json() == ProductSerializer(Product.objects.order_by("id"), many = True).data
+    assert [(i.price, i.in_stock, i.updated_by) for i in Product.objects.order_by("id")] == [(Decimal("1.00"), True, data.staff_user), (Decimal("13.54"), False, data.staff_user)]
+
+@mark.django_db
+def test_PATCH_bulk_products_failed_repeated_id(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.patch("/api/v1/products/bulk/", data = [{"id": 1}, {"id": 2, "price": "1.00"}, {"id": 1, "name": "item3"}], format = "json")
+    assert response.status_code == 400
+    assert response.json() == [{}, {}, {"id": ["Id repetido na lista."]}]
+    assert Product.objects.get(id = 1).name == "item1"
+
+@mark.django_db
+def test_DELETE_bulk_products_successful(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.delete("/api/v1/products/bulk/", data = [1, 2], format = "json")
+    assert response.status_code == 204
+    assert Product.objects.count() == 0
+
+@mark.django_db
+def test_POST_bulk_products_with_normal_user_failed(data):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    response = client.post("/api/v1/products/bulk/", data = [{"name": "item3", "price": 10, "description": "description test", "max_complements": 2, "category": data.category.id}], format = "json")
+    assert response.status_code == 403
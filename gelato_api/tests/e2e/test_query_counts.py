@@ -0,0 +1,43 @@
+from pytest import mark, fixture
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from gelato_api.menus import rebuild_menus
+from gelato_api.models import User, Product, Category, Complement, Order
+from gelato_api.cache import get_cache
+from utils import get_actions, get_action_url
+
+def seed(amount, offset):
+    categories = [Category.objects.get_or_create(name = "Ice Cream")[0], Category.objects.get_or_create(name = "Cake")[0]]
+    for i in range(offset, offset + amount):
+        user = User.objects.create_user(email=f"user{i}@user.com", password="12345", first_name="User", last_name=str(i))
+        Product.objects.create(name = f"item{i}", price = 10, description = "description test", max_complements = 3, category = categories[0], created_by = user, updated_by = user)
+        complement = Complement.objects.create(name = f"candy{i}", increase_value = 1, created_by = user, updated_by = user)
+        complement.categories.set(categories)
+        Order.objects.create(user = user, comment = f"{i}x Ice Cream 700ml", delivery = False, location = "location_test")
+    # the menus are rebuilt after commit, which never happens inside the test transaction
+    rebuild_menus()
+
+def count_queries(client, prefix, action, detail):
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(get_action_url(prefix, action, detail))
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+@fixture
+def client():
+    superuser = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+    client = APIClient()
+    client.force_authenticate(user = superuser)
+    return client
+
+@mark.parametrize("prefix, action, detail", get_actions())
+@mark.django_db
+def test_query_count_does_not_grow_with_results(prefix, action, detail, client):
+    seed(2, 0)
+    expected_queries = count_queries(client, prefix, action, detail)
+    seed(6, 2)
+    assert count_queries(client, prefix, action, detail) == expected_queries
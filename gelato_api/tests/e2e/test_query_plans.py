@@ -0,0 +1,54 @@
+from pytest import mark, fixture
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from gelato_api.cache import get_cache
+from gelato_api.explain import find_full_scans
+from gelato_api.menus import rebuild_menus
+from gelato_api.models import User, Product, Category, Complement, Order
+from utils import get_actions, get_action_url
+
+MAX_SCAN_ROWS = 20
+
+@fixture
+def client():
+    superuser = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+    categories = Category.objects.bulk_create([Category(name = f"category{i}") for i in range(MAX_SCAN_ROWS * 2)])
+    users = User.objects.bulk_create([User(email = f"user{i}@user.com", first_name = "User", last_name = str(i)) for i in range(MAX_SCAN_ROWS * 2)])
+    products = Product.objects.bulk_create([Product(name = f"item{i}", price = 10, description = "description test", max_complements = 3, category = categories[i % 4], created_by = superuser) for i in range(MAX_SCAN_ROWS * 2)])
+    complements = Complement.objects.bulk_create([Complement(name = f"candy{i}", increase_value = 1, created_by = superuser) for i in range(MAX_SCAN_ROWS * 2)])
+    Complement.categories.through.objects.bulk_create([Complement.categories.through(complement_id = complement.id, category_id = categories[i % 4].id) for i, complement in enumerate(complements)])
+    Order.objects.bulk_create([Order(user = users[i % 5], comment = f"{i}x Ice Cream 700ml", delivery = False, location = "location_test", status = "Pedido solicitado") for i in range(MAX_SCAN_ROWS * 2)])
+    rebuild_menus()
+    client = APIClient()
+    client.force_authenticate(user = superuser)
+    return client
+
+@mark.parametrize("prefix, action, detail", get_actions())
+@mark.django_db
+def test_query_plans_without_full_table_scans(prefix, action, detail, client):
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(get_action_url(prefix, action, detail))
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code == 200
+    assert find_full_scans(context.captured_queries, max_rows = MAX_SCAN_ROWS) == []
+
+@mark.parametrize("url", [
+    "/api/v1/products/?category=1",
+    "/api/v1/products/?category=1&ordering=price",
+    "/api/v1/products/?category=1&ordering=-name",
+    "/api/v1/complements/?category=1",
+    "/api/v1/complements/?category=1&ordering=increase_value",
+    "/api/v1/orders/?status=Entregue",
+    "/api/v1/orders/?status=Entregue&ordering=-created_at",
+    "/api/v1/users/?page=2"
+])
+@mark.django_db
+def test_query_plans_filtered_lists_without_full_table_scans(url, client):
+    get_cache().clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert find_full_scans(context.captured_queries, max_rows = MAX_SCAN_ROWS) == []
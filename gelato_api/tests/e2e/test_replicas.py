@@ -0,0 +1,73 @@
+from pytest import mark, fixture
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from gelato_api.models import User, Product, Category, Order
+from gelato_api.routers import PIN_COOKIE
+
+pytestmark = [
+    mark.skipif("replica" not in django_settings.DATABASES, reason = "needs a 'replica' database"),
+    mark.django_db(databases = ["default", "replica"])
+]
+
+@fixture
+def data(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    cache.clear()
+    class Data():
+        normal_user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+        staff_user = User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+        category = Category.objects.create(name = "Ice Cream")
+        product = Product.objects.create(name = "item1", price = "12.34", description = "description test", max_complements = 2, category = category, created_by = staff_user)
+        order = Order.objects.create(user = normal_user, delivery = False)
+    return Data()
+
+@mark.parametrize("url", ["/api/v1/products/", "/api/v1/categories/", "/api/v1/complements/"])
+def test_GET_catalog_reads_from_replica(url, data):
+    response = APIClient().get(url)
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+
+def test_GET_product_detail_reads_from_replica(data):
+    response = APIClient().get(f"/api/v1/products/{data.product.id}/")
+    assert response.status_code == 404
+
+def test_GET_orders_reads_from_primary(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.get("/api/v1/orders/")
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+def test_POST_product_writes_to_primary_and_pins_reads(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    response = client.post("/api/v1/products/", {"name": "item2", "price": 13.54, "description": "description test", "max_complements": 3, "category": data.category.id})
+    assert response.status_code == 201
+    assert PIN_COOKIE in response.cookies
+    assert Product.objects.using("default").filter(name = "item2").exists()
+    assert client.get("/api/v1/products/").json()["count"] == 2
+    client.cookies.clear()
+    assert client.get("/api/v1/products/").json()["count"] == 2
+
+def test_GET_pinned_skips_replica_cached_response(data):
+    assert APIClient().get("/api/v1/products/").json()["count"] == 0
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    client.patch(f"/api/v1/categories/{data.category.id}/", {"name": "Popsicle"})
+    assert client.get("/api/v1/products/").json()["count"] == 1
+
+def test_GET_pin_expires_to_replica(data):
+    client = APIClient()
+    client.force_authenticate(user = data.staff_user)
+    client.post("/api/v1/categories/", {"name": "Popsicle"})
+    cache.clear()
+    client.cookies.clear()
+    assert client.get("/api/v1/categories/").json()["count"] == 0
+
+def test_failed_POST_does_not_pin(data):
+    client = APIClient()
+    client.force_authenticate(user = data.normal_user)
+    response = client.post("/api/v1/products/", {"name": "item2"})
+    assert response.status_code == 403
+    assert PIN_COOKIE not in response.cookies
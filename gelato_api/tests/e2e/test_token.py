@@ -0,0 +1,44 @@
+from pytest import mark, fixture
+from django.contrib.auth.hashers import make_password
+from rest_framework.test import APIClient
+from gelato_api import hashing
+from gelato_api.models import User
+
+@fixture
+def data(settings):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher", "django.contrib.auth.hashers.ScryptPasswordHasher"]
+    class Data():
+        normal_user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+    return Data()
+
+@mark.django_db
+def test_POST_token_successful(data):
+    response = APIClient().post("/api/token/", data = {"email": "normal@user.com", "password": "12345"}, format = "json")
+    assert response.status_code == 200
+    assert set(response.json().keys()) == {"access", "refresh"}
+
+@mark.django_db
+def test_POST_token_rehashes_upgraded_hasher(data):
+    User.objects.filter(id = data.normal_user.id).update(password = make_password("12345", hasher = "scrypt"))
+    response = APIClient().post("/api/token/", data = {"email": "normal@user.com", "password": "12345"}, format = "json")
+    assert response.status_code == 200
+    assert User.objects.get(id = data.normal_user.id).password.startswith("md5$")
+
+@mark.django_db
+def test_POST_token_with_offload_successful(data, settings):
+    settings.PASSWORD_HASHING = {"OFFLOAD": True, "EXECUTOR": "thread", "WORKERS": 1, "MAX_PENDING": 2}
+    response = APIClient().post("/api/token/", data = {"email": "normal@user.com", "password": "12345"}, format = "json")
+    assert response.status_code == 200
+    response = APIClient().post("/api/token/", data = {"email": "normal@user.com", "password": "wrong"}, format = "json")
+    assert response.status_code == 401
+
+@mark.django_db
+def test_POST_token_with_offload_queue_full_failed(data, settings):
+    settings.PASSWORD_HASHING = {"OFFLOAD": True, "EXECUTOR": "thread", "WORKERS": 1, "MAX_PENDING": 1}
+    pool = hashing.get_pool(hashing.get_config())
+    pool.slots.acquire()
+    try:
+        response = APIClient().post("/api/token/", data = {"email": "normal@user.com", "password": "12345"}, format = "json")
+    finally:
+        pool.slots.release()
+    assert response.status_code == 503
@@ -0,0 +1,20 @@
+from gelato_api.urls import router
+
+def get_actions():
+    # every GET route of the API router as (prefix, action, detail)
+    actions = []
+    for prefix, viewset, basename in router.registry:
+        actions.append((prefix, "list", False))
+        actions.append((prefix, "retrieve", True))
+        for extra_action in viewset.get_extra_actions():
+            if "get" in extra_action.mapping:
+                actions.append((prefix, extra_action.url_path, extra_action.detail))
+    return actions
+
+def get_action_url(prefix, action, detail):
+    url = f"/api/v1/{prefix}/"
+    if detail:
+        url += "1/"
+    if action not in ("list", "retrieve"):
+        url += f"{action}/"
+    return url
@@ -0,0 +1,42 @@
+from pytest import mark, fixture, raises
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from gelato_api.authentication import CachedJWTAuthentication
+from gelato_api.models import User
+from gelato_api.serializers import UserSerializer
+
+@fixture
+def user():
+    return User.objects.create_user(email="staff@user.com", password="12345", first_name="Staff", last_name="User", is_staff = True)
+
+@mark.django_db
+def test_get_user_from_CachedJWTAuthentication_skips_query(user, django_assert_num_queries):
+    token = AccessToken.for_user(user)
+    CachedJWTAuthentication().get_user(token)
+    with django_assert_num_queries(0):
+        cached_user = CachedJWTAuthentication().get_user(token)
+    assert (cached_user.id, cached_user.email, cached_user.is_staff, cached_user.is_superuser) == (user.id, user.email, True, False)
+
+@mark.django_db
+def test_get_user_from_CachedJWTAuthentication_invalidated_on_update(user):
+    token = AccessToken.for_user(user)
+    CachedJWTAuthentication().get_user(token)
+    class Request():
+        data = {}
+    Request.user = user
+    serializer = UserSerializer(user, context = {"request": Request()}, data = {"is_active": False}, partial = True)
+    serializer.is_valid()
+    serializer.save()
+    with raises(AuthenticationFailed):
+        CachedJWTAuthentication().get_user(token)
+
+@mark.django_db
+def test_save_cached_user_keeps_other_fields(user):
+    token = AccessToken.for_user(user)
+    CachedJWTAuthentication().get_user(token)
+    cached_user = CachedJWTAuthentication().get_user(token)
+    cached_user.first_name = "Changed"
+    cached_user.save()
+    user.refresh_from_db()
+    assert user.first_name == "Changed"
+    assert user.check_password("12345")
@@ -0,0 +1,27 @@
+from pytest import raises
+from root_api.env import Env
+
+def test_env_parses_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("DATABASE_NAME", raising = False)
+    path = tmp_path / ".env"
+    path.write_text("DATABASE_NAME=gelato\n\n# comment\nexport DATABASE_HOST = 127.0.0.1\nSECRET_KEY='a=b#c'\nDATABASE_PORT=\ninvalid line\n")
+    env = Env(path)
+    assert env["DATABASE_NAME"] == "gelato"
+    assert env["DATABASE_HOST"] == "127.0.0.1"
+    assert env["SECRET_KEY"] == "a=b#c"
+    assert env.int("DATABASE_PORT", 3306) == 3306
+    assert "invalid line" not in env
+
+def test_env_is_lazy_and_environment_wins(tmp_path, monkeypatch):
+    path = tmp_path / ".env"
+    env = Env(path)
+    path.write_text("DATABASE_CONN_MAX_AGE=30\nDEBUG=true")
+    monkeypatch.setenv("DATABASE_CONN_MAX_AGE", "0")
+    assert env.int("DATABASE_CONN_MAX_AGE", 60) == 0
+    assert env.bool("DEBUG", False) == True
+
+def test_env_missing_file_and_key(tmp_path):
+    env = Env(tmp_path / ".env")
+    assert env.bool("DATABASE_CONN_HEALTH_CHECKS", True) == True
+    with raises(KeyError):
+        env["GELATO_MISSING_KEY"]
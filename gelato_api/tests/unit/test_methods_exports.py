@@ -0,0 +1,12 @@
+from pytest import mark
+from gelato_api.exports import iterate_in_chunks
+from gelato_api.models import User, Order
+
+@mark.django_db
+def test_iterate_in_chunks_returns_every_row(django_assert_num_queries):
+    user = User.objects.create_user(email="normal@user.com", password="12345", first_name="Normal", last_name="User")
+    for i in range(5):
+        Order.objects.create(user = user, comment = f"{i}x Ice Cream 700ml", delivery = False, location = "location_test")
+    with django_assert_num_queries(3):
+        rows = list(iterate_in_chunks(Order.objects.values_list("id", "comment"), chunk_size = 2))
+    assert [i[1] for i in rows] == [f"{i}x Ice Cream 700ml" for i in range(5)]
@@ -0,0 +1,58 @@
+from pytest import mark, fixture
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APIClient
+from rest_framework.request import Request
+from gelato_api.models import User, Product, Category, Complement, Order, OrderItem, OrderItemComplement
+from gelato_api.readers import ValuesReader, get_reader
+from gelato_api.serializers import ProductSerializer, CategorySerializer, ComplementSerializer, OrderSerializer
+
+@fixture
+def data():
+    class Data():
+        superuser = User.objects.create_superuser(email="super@user.com", password="12345", first_name="Super", last_name="User")
+        category = Category.objects.create(name = "Ice Cream")
+        other_category = Category.objects.create(name = "Cake")
+        product1 = Product.objects.create(name = "item1", price = "12.30", description = "description test", max_complements = 3, category = category, created_by = superuser, image = "0123abcd.png")
+        product2 = Product.objects.create(name = "item2", price = "7", description = "description test", max_complements = 3, category = other_category, created_by = superuser, in_stock = False)
+        complement1 = Complement.objects.create(name = "candy", increase_value = "1.50", created_by = superuser)
+        complement2 = Complement.objects.create(name = "candy2", increase_value = "0", created_by = superuser, image = "fotos/açaí 1.png")
+        complement1.categories.set([category, other_category])
+        order = Order.objects.create(user = superuser, comment = "1x Ice Cream 700ml", delivery = True, location = "location_test", status = "Pedido solicitado", total = "27.60")
+        empty_order = Order.objects.create(user = superuser, comment = "2x Ice Cream 700ml", delivery = False, location = "location_test", status = "Em preparo", active = False)
+        item1 = OrderItem.objects.create(order = order, product = product1, quantity = 2, unit_price = "13.80", total = "27.60")
+        item2 = OrderItem.objects.create(order = order, product = product2, quantity = 1, unit_price = "7.00", total = "7.00")
+        OrderItemComplement.objects.create(item = item1, complement = complement1, increase_value = "1.50")
+        OrderItemComplement.objects.create(item = item1, complement = complement2, increase_value = "0")
+        product2.delete()
+    return Data()
+
+@mark.parametrize("serializer_class, queryset, fields", [
+    (ProductSerializer, Product.objects.order_by("id"), None),
+    (ProductSerializer, Product.objects.order_by("id"), ("id", "name", "price", "image_variants")),
+    (CategorySerializer, Category.objects.order_by("id"), None),
+    (ComplementSerializer, Complement.objects.prefetch_related("categories").order_by("id"), None),
+    (OrderSerializer, Order.objects.prefetch_related("items__complements").order_by("id"), None),
+    (OrderSerializer, Order.objects.order_by("id"), ("id", "total", "created"))
+])
+@mark.django_db
+def test_values_reader_renders_same_json_as_serializer(serializer_class, queryset, fields, data):
+    request = Request(APIRequestFactory().get("/api/v1/"))
+    context = {"request": request, "fields": fields}
+    expected = JSONRenderer().render(serializer_class(queryset, many = True, context = context).data)
+    reader = ValuesReader(serializer_class, fields)
+    assert JSONRenderer().render(reader.read(list(reader.values(queryset)), request)) == expected
+
+@mark.django_db
+def test_values_reader_loads_relations_in_batch(data, django_assert_num_queries):
+    reader = ValuesReader(OrderSerializer)
+    with django_assert_num_queries(3):
+        reader.read(list(reader.values(Order.objects.all())))
+
+@mark.django_db
+def test_get_reader_shared_by_same_fields_in_any_order(data):
+    client = APIClient()
+    get_reader.cache_clear()
+    response1 = client.get("/api/v1/products/?fields=name,price")
+    response2 = client.get("/api/v1/products/?fields=price,name,name")
+    assert response1.json() == response2.json()
+    assert get_reader.cache_info().currsize == 1
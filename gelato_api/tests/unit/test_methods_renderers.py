@@ -0,0 +1,20 @@
+from datetime import datetime, date
+from decimal import Decimal
+from pytest import mark
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from gelato_api.renderers import FastJSONRenderer
+
+@mark.parametrize("data", [
+    {"price": Decimal("12.34"), "increase_value": Decimal("0.10")},
+    {"created": datetime(2024, 1, 10, 12, 30, 15, 123456), "day": date(2024, 1, 10)},
+    {"name": "açaí   sorvete  ", "detail": gettext_lazy("Not found.")},
+    ReturnDict({"results": ReturnList([{"id": 1, "active": True, "image": None}], serializer = None), 2: "two"}, serializer = None),
+    [1, 2.5, "3"]
+])
+def test_fast_json_renderer_matches_json_renderer(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+def test_fast_json_renderer_keeps_indent():
+    assert FastJSONRenderer().render({"id": 1}, "application/json; indent=4") == JSONRenderer().render({"id": 1}, "application/json; indent=4")
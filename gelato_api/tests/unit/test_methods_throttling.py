@@ -0,0 +1,45 @@
+from pytest import fixture
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from gelato_api.throttling import SlidingWindowThrottle
+
+class Request():
+    user = AnonymousUser()
+    META = {"REMOTE_ADDR": "10.0.0.1"}
+
+class View():
+    action = "list"
+    throttle_scopes = {"list": "catalog"}
+
+@fixture
+def clock():
+    cache.clear()
+    class Clock():
+        now = 6000.0
+    return Clock()
+
+def make_throttle(clock, rates = {"anon": "2/minute", "catalog": "3/minute"}):
+    throttle = SlidingWindowThrottle()
+    throttle.THROTTLE_RATES = rates
+    throttle.timer = lambda: clock.now
+    return throttle
+
+def test_allow_request_from_SlidingWindowThrottle_uses_view_scope(clock):
+    results = [make_throttle(clock).allow_request(Request(), View()) for i in range(4)]
+    assert results == [True, True, True, False]
+    view = View()
+    view.action = "create"
+    assert [make_throttle(clock).allow_request(Request(), view) for i in range(3)] == [True, True, False]
+
+def test_allow_request_from_SlidingWindowThrottle_weights_previous_window(clock):
+    for i in range(3):
+        make_throttle(clock).allow_request(Request(), View())
+    clock.now += 60
+    throttle = make_throttle(clock)
+    assert not throttle.allow_request(Request(), View())
+    assert throttle.wait() == 20
+    clock.now += 20
+    assert make_throttle(clock).allow_request(Request(), View())
+    assert not make_throttle(clock).allow_request(Request(), View())
+    clock.now += 40
+    assert make_throttle(clock).allow_request(Request(), View())
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # the scope, and so the rate, is only known once the view is resolved
+        pass
+
+    def get_store(self):
+        return caches[getattr(settings, "THROTTLE_CACHE_ALIAS", "default")]
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None)) or getattr(view, "throttle_scope", None)
+        if scope:
+            return scope
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def get_counts(self):
+        window, elapsed = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+        return current_key, self.get_store().get(previous_key, 0), elapsed
+
+    def estimate(self, previous, current, elapsed):
+        return previous * (self.duration - elapsed) / self.duration + current
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        self.now = self.timer()
+        store = self.get_store()
+        current_key, self.previous, self.elapsed = self.get_counts()
+        store.add(current_key, 0, self.duration * 2)
+        # two counters per key instead of a history list, incr is atomic on shared backends (Redis, Memcached)
+        self.current = store.incr(current_key)
+        if self.estimate(self.previous, self.current, self.elapsed) > self.num_requests:
+            self.current = store.decr(current_key)
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+        if self.current >= self.num_requests or not self.previous:
+            return remaining
+        # the weight of the previous window has to fall enough to fit one more request
+        return max(remaining - self.duration * (self.num_requests - self.current - 1) / self.previous, 0)
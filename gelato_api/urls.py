@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework import routers
-from .views import ProductViewSet, CategoryViewSet, ComplementViewSet, OrderViewSet, UserViewSet
+from .views import ProductViewSet, CategoryViewSet, ComplementViewSet, OrderViewSet, UserViewSet, MenuViewSet, order_events, metrics
 
 router = routers.SimpleRouter()
 router.register("products", ProductViewSet)
@@ -8,7 +8,10 @@ router.register("categories", CategoryViewSet)
 router.register("complements", ComplementViewSet)
 router.register("orders", OrderViewSet)
 router.register("users", UserViewSet)
+router.register("menu", MenuViewSet)
 
 urlpatterns = [
+    path('v1/orders/events/', order_events),
+    path('v1/metrics/', metrics),
     path('v1/', include(router.urls))
 ]
\ No newline at end of file
@@ -1,14 +1,44 @@
-from rest_framework import viewsets, mixins
+from asgiref.sync import sync_to_async
+from pathlib import PurePosixPath
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+from django.views.static import serve
+from rest_framework import viewsets, mixins, exceptions
 from rest_framework.response import Response
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 from .permissions import *
-from .models import Product, Category, Complement, Order, User
-from .serializers import ProductSerializer, CategorySerializer, ComplementSerializer, OrderSerializer, UserSerializer
+from .authentication import CachedJWTAuthentication
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .bulk import BulkMixin
+from .filters import FilterMixin
+from .sparse import SparseFieldsMixin
+from .readers import ValuesListMixin
+from .asyncviews import AsyncViewSetMixin
+from .routers import ReplicaReadMixin
+from .metrics import MetricsMixin, measure_serializer, registry
+from .pagination import OrderPagination, UserPagination, MenuPagination
+from .events import get_broker
+from .exports import EXPORT_FORMATS
+from .stats import summarize_order_stats
+from .models import Product, Category, Complement, Order, User, DailyOrderStats, CategoryMenu
+from .serializers import ProductSerializer, CategorySerializer, ComplementSerializer, OrderSerializer, UserSerializer, ProductBulkSerializer, CategoryBulkSerializer, ComplementBulkSerializer, OrderExportSerializer, OrderStatsSerializer, ProductFilterSerializer, ComplementFilterSerializer, OrderFilterSerializer
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(MetricsMixin, ConditionalGetMixin, CachedResponseMixin, BulkMixin, FilterMixin, SparseFieldsMixin, ValuesListMixin, ReplicaReadMixin, AsyncViewSetMixin, viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     queryset = Product.objects.all().order_by("id")
+    async_actions = ("list", "retrieve")
+    filter_serializer_class = ProductFilterSerializer
+    cache_models = (Product, Category, Complement)
+    throttle_scopes = {"list": "catalog", "retrieve": "catalog", "complements": "catalog"}
+    bulk_serializer_class = ProductBulkSerializer
+    bulk_foreign_keys = {"category": Category}
     def get_permissions(self):
         if self.action == 'list' or self.action == 'retrieve' or self.action == 'complements':
             permission_classes = [permissions.AllowAny]
@@ -18,13 +48,32 @@ class ProductViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"])
     def complements(self, request, pk=None):
+        return self.get_cached_response(self.get_complements, request, pk)
+
+    def get_complements(self, request, pk=None):
         product = self.get_object()
-        serializer = ComplementSerializer(Complement.objects.filter(categories__id=product.category.id), many=True)
-        return Response(serializer.data)
+        fields = self.get_sparse_fields(ComplementSerializer)
+        complements = Complement.objects.filter(categories__id=product.category_id).order_by("id")
+        if fields:
+            columns, relations = ComplementSerializer.get_columns(Complement, fields)
+            complements = complements.only(*columns)
+            if "categories" in relations:
+                complements = complements.prefetch_related("categories")
+        else:
+            complements = complements.prefetch_related("categories")
+        serializer = ComplementSerializer(complements, many=True, context={"fields": fields})
+        with measure_serializer():
+            data = serializer.data
+        return Response(data)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(MetricsMixin, ConditionalGetMixin, CachedResponseMixin, BulkMixin, SparseFieldsMixin, ValuesListMixin, ReplicaReadMixin, AsyncViewSetMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     queryset = Category.objects.all().order_by("id")
+    async_actions = ("list", "retrieve")
+    cache_models = (Category,)
+    throttle_scopes = {"list": "catalog", "retrieve": "catalog"}
+    bulk_serializer_class = CategoryBulkSerializer
+    bulk_stamp_users = False
     def get_permissions(self):
         if self.action == 'list' or self.action == 'retrieve':
             permission_classes = [permissions.AllowAny]
@@ -32,9 +81,15 @@ class CategoryViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in permission_classes]
 
-class ComplementViewSet(viewsets.ModelViewSet):
+class ComplementViewSet(MetricsMixin, ConditionalGetMixin, CachedResponseMixin, BulkMixin, FilterMixin, SparseFieldsMixin, ValuesListMixin, ReplicaReadMixin, AsyncViewSetMixin, viewsets.ModelViewSet):
     serializer_class = ComplementSerializer
-    queryset = Complement.objects.all().order_by("id")
+    queryset = Complement.objects.prefetch_related("categories").order_by("id")
+    async_actions = ("list", "retrieve")
+    filter_serializer_class = ComplementFilterSerializer
+    cache_models = (Complement, Category)
+    throttle_scopes = {"list": "catalog", "retrieve": "catalog"}
+    bulk_serializer_class = ComplementBulkSerializer
+    bulk_many_to_many = {"categories": Category}
     def get_permissions(self):
         if self.action == 'list' or self.action == 'retrieve':
             permission_classes = [permissions.AllowAny]
@@ -42,9 +97,13 @@ class ComplementViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in permission_classes]
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(MetricsMixin, ConditionalGetMixin, FilterMixin, SparseFieldsMixin, ValuesListMixin, AsyncViewSetMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
-    queryset = Order.objects.all().order_by("id")
+    queryset = Order.objects.prefetch_related("items__complements").order_by("id")
+    async_actions = ("create",)
+    filter_serializer_class = OrderFilterSerializer
+    pagination_class = OrderPagination
+    throttle_scopes = {"create": "orders"}
     def get_permissions(self):
         if self.action == 'create':
             permission_classes = [permissions.IsAuthenticated]
@@ -54,9 +113,31 @@ class OrderViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in permission_classes]
 
-class UserViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        filters = OrderExportSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filters.filter_queryset(Order.objects.all())
+        stream, content_type = EXPORT_FORMATS[filters.validated_data["output"]]
+        response = StreamingHttpResponse(stream(queryset), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{filters.validated_data["output"]}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        filters = OrderStatsSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        rows = DailyOrderStats.objects.exclude(orders=0).order_by("day", "status")
+        if "day_from" in filters.validated_data:
+            rows = rows.filter(day__gte=filters.validated_data["day_from"])
+        if "day_to" in filters.validated_data:
+            rows = rows.filter(day__lte=filters.validated_data["day_to"])
+        return Response(summarize_order_stats(rows))
+
+class UserViewSet(MetricsMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     serializer_class = UserSerializer
     queryset = User.objects.all().order_by("id")
+    pagination_class = UserPagination
     permission_classes = [IsSuperuser]
     def get_permissions(self):
         if self.action == 'create':
@@ -66,4 +147,59 @@ class UserViewSet(viewsets.ModelViewSet):
         else:
             permission_classes = [IsSuperuser]
         return [permission() for permission in permission_classes]
-        
\ No newline at end of file
+
+class MenuViewSet(MetricsMixin, ReplicaReadMixin, viewsets.GenericViewSet):
+    # documents precomputed by gelato_api.menus, served as stored
+    queryset = CategoryMenu.objects.order_by("category_id")
+    permission_classes = [permissions.AllowAny]
+    throttle_scopes = {"list": "catalog", "retrieve": "catalog"}
+    pagination_class = MenuPagination
+    lookup_value_regex = r"\d+"
+    def list(self, request):
+        page = self.paginate_queryset(self.get_queryset().values_list("document", flat=True))
+        return self.get_paginated_response(page)
+
+    def retrieve(self, request, pk=None):
+        document = self.get_queryset().filter(category_id=pk).values_list("document", flat=True).first()
+        if document is None:
+            raise exceptions.NotFound()
+        return Response(document)
+
+class LoginView(TokenObtainPairView):
+    throttle_scope = "login"
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+@throttle_classes([])
+def metrics(request):
+    # polled by the scraper, so staff only and without the per user rate
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@require_GET
+async def order_events(request):
+    try:
+        auth = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except exceptions.AuthenticationFailed as error:
+        return JsonResponse({"detail": error.detail}, status=error.status_code)
+    if auth is None:
+        return JsonResponse({"detail": exceptions.NotAuthenticated.default_detail}, status=401)
+    if not auth[0].is_staff:
+        return JsonResponse({"detail": exceptions.PermissionDenied.default_detail}, status=403)
+    response = StreamingHttpResponse(get_broker().stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@require_GET
+def serve_media(request, path):
+    # media names are content hashes (variants derive from them), so the name is a strong validator
+    etag = f'"{PurePosixPath(path).stem}"'
+    if not default_storage.exists(path):
+        raise Http404
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    return response
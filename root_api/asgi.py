@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'root_api.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
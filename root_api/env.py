@@ -0,0 +1,53 @@
+import os
+from collections.abc import Mapping
+
+class Env(Mapping):
+    # .env values, read on first access; variables already in the process environment take precedence
+    def __init__(self, path):
+        self.path = path
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = {**self.parse(), **os.environ}
+        return self._data
+
+    def parse(self):
+        data = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return data
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key = key.strip().removeprefix("export ").strip()
+            value = value.strip()
+            if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            data[key] = value
+        return data
+
+    def __getitem__(self, key):
+        try:
+            return self.data[key]
+        except KeyError:
+            raise KeyError(f"{key} não definido no arquivo .env nem nas variáveis de ambiente") from None
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def int(self, key, default):
+        value = self.get(key, "")
+        return int(value) if value.strip() else default
+
+    def bool(self, key, default):
+        value = self.get(key, "")
+        return value.strip().lower() in ("1", "true", "yes", "on") if value.strip() else default
@@ -10,18 +10,20 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
-# .env data
-ENV = {}
-with open(".env", "r") as f:
-    for i in f.read().split("\n"):
-        ENV[i.split("=", 1)[0]] = i.split("=", 1)[1]
-
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+from .env import Env
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# .env data (environment variables override the file)
+ENV = Env(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -30,7 +32,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = ENV["SECRET_KEY"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = ENV.bool('DEBUG', True)
 
 ALLOWED_HOSTS = ["*"]
 
@@ -51,10 +53,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'gelato_api.middleware.CompressionMiddleware',
+    'gelato_api.middleware.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'gelato_api.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,18 +95,59 @@ DATABASES = {
         'USER': 'root',
         'PASSWORD': ENV['ROOT_PASSWORD'],
         'HOST': ENV['DATABASE_HOST'],
-        'PORT': ENV['DATABASE_PORT']
+        'PORT': ENV['DATABASE_PORT'],
+        # keep connections open between requests, checking them before reuse (runserver opens a thread per request, so only outside DEBUG)
+        'CONN_MAX_AGE': ENV.int('DATABASE_CONN_MAX_AGE', 0 if DEBUG else 60),
+        'CONN_HEALTH_CHECKS': ENV.bool('DATABASE_CONN_HEALTH_CHECKS', True)
     }
 }
+
+# Optional in-process pool (pip install django-db-connection-pool), connections go back to the pool after each request
+if ENV.int('DATABASE_POOL_SIZE', 0):
+    if not find_spec('dj_db_conn_pool'):
+        raise ImproperlyConfigured('DATABASE_POOL_SIZE requires django-db-connection-pool (pip install django-db-connection-pool)')
+    DATABASES['default'].update({
+        'ENGINE': 'dj_db_conn_pool.backends.mysql',
+        'CONN_MAX_AGE': 0,
+        'POOL_OPTIONS': {
+            'POOL_SIZE': ENV.int('DATABASE_POOL_SIZE', 0),
+            'MAX_OVERFLOW': ENV.int('DATABASE_POOL_MAX_OVERFLOW', 10),
+            'RECYCLE': ENV.int('DATABASE_POOL_RECYCLE', 3600)
+        }
+    })
+
+# Read replicas of the default database (comma separated hosts), used by the catalog viewsets for safe requests
+DATABASE_REPLICAS = []
+for i, host in enumerate(filter(None, ENV.get('DATABASE_REPLICA_HOSTS', '').split(','))):
+    DATABASES[f'replica{i + 1}'] = {**DATABASES['default'], 'HOST': host.strip()}
+    DATABASE_REPLICAS.append(f'replica{i + 1}')
 '''
-# Configs for tests with database
+# Configs for tests with database (the replica only receives reads when listed in DATABASE_REPLICAS)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'test_database'
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'test_database_replica'
     }
 }
 '''
+
+DATABASE_ROUTERS = ['gelato_api.routers.ReplicaRouter']
+
+# Seconds a client that just wrote keeps reading from the primary
+REPLICA_PIN_SECONDS = 5
+
+# Per route request metrics (Prometheus text format, per process) served to staff at /api/v1/metrics/
+METRICS_ENABLED = True
+
+# Log to gelato_api.slow_queries the queries slower than SLOW_QUERY_MS (None disables), sampling SLOW_QUERY_SAMPLE_RATE of them
+SLOW_QUERY_MS = None
+
+SLOW_QUERY_SAMPLE_RATE = 1.0
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -122,24 +168,61 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "gelato_api.User"
 
+# Run password hashing/verification in a bounded pool ("thread" or "process"), refusing with 503 above MAX_PENDING
+PASSWORD_HASHING = {
+    "OFFLOAD": False,
+    "EXECUTOR": "thread",
+    "WORKERS": None,
+    "MAX_PENDING": 64
+}
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'gelato_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer'
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'gelato_api.authentication.CachedJWTAuthentication'
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'gelato_api.pagination.AsyncPageNumberPagination',
     'PAGE_SIZE': 15,
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'gelato_api.throttling.SlidingWindowThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '4/minute',
-        'user': '6/minute'
+        'user': '6/minute',
+        'catalog': '60/minute',
+        'orders': '10/minute',
+        'login': '5/minute'
     }
 }
 
+# Catalog response cache, versioned per model (use a shared backend such as Redis in CACHES for multiple workers)
+CATALOG_CACHE_ALIAS = "default"
+
+CATALOG_CACHE_TIMEOUT = None
+
+# Order events stream broker (gelato_api.events.RedisBroker with ORDER_EVENTS_REDIS_URL for multiple workers)
+ORDER_EVENTS_BROKER = "gelato_api.events.InProcessBroker"
+
 from datetime import timedelta
 
+# Cache holding the throttle counters, point it to a shared backend (e.g. django.core.cache.backends.redis.RedisCache) for multiple workers
+THROTTLE_CACHE_ALIAS = "default"
+
+# Seconds the flags of an authenticated user stay cached (invalidated on save)
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Catalog list/retrieve and order creation as async views, turned on by root_api/asgi.py (under WSGI each one would run through a one-off event loop)
+ASYNC_VIEWS = ENV.bool('ASYNC_VIEWS', False)
+
+# Responses smaller than this (in bytes) are sent without gzip/brotli compression
+COMPRESSION_MIN_SIZE = 1024
+
+# Rows above which a full table scan in a query plan is reported by gelato_api.explain.find_full_scans
+QUERY_PLAN_MAX_SCAN_ROWS = 1000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -166,6 +249,9 @@ MEDIA_URL = 'media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Threads that generate the resized WebP variants of uploaded images (0 generates them after the commit, in the request)
+IMAGE_WORKERS = 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
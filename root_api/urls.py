@@ -1,12 +1,16 @@
 from django.contrib import admin
-from django.urls import path, include
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.urls import path, re_path, include
+from rest_framework_simplejwt.views import TokenRefreshView
 from django.conf import settings
-from django.conf.urls.static import static
+from gelato_api.views import LoginView, serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/token/', TokenObtainPairView.as_view()),
+    path('api/token/', LoginView.as_view()),
     path('api/token/refresh/', TokenRefreshView.as_view()),
     path("api/", include("gelato_api.urls"))
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# development only, in production the reverse proxy serves MEDIA_ROOT (see README)
+if settings.DEBUG:
+    urlpatterns.append(re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$", serve_media))